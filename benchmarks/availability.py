@@ -0,0 +1,85 @@
+"""
+Сравнение поиска свободных номеров: индекс в памяти против CTE-запроса rooms_ids_for_booking.
+
+    python -m benchmarks.availability                  # только индекс в памяти
+    python -m benchmarks.availability --sql --seed     # плюс SQL-путь на базе из .env
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import timedelta
+
+from benchmarks.seed import generate_dataset, seed_database
+from src.utils.availability import AvailabilityIndex
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+async def timed_async(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await func()
+    return (time.perf_counter() - start) / repeat
+
+
+def random_ranges(data, count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    first = min(b[3] for b in data.bookings[:1000])
+    for _ in range(count):
+        date_from = first + timedelta(days=rnd.randrange(365))
+        yield date_from, date_from + timedelta(days=rnd.randint(1, 14))
+
+
+async def main(args):
+    data = generate_dataset(hotels=args.hotels, rooms=args.rooms, bookings=args.bookings)
+    rooms = [(r[0], r[1], r[5]) for r in data.rooms]
+    bookings = [(b[2], b[3], b[4]) for b in data.bookings]
+    ranges = list(random_ranges(data, args.repeat))
+
+    index = AvailabilityIndex()
+    start = time.perf_counter()
+    index.build(rooms, bookings)
+    print(f"build: {time.perf_counter() - start:.3f}s, matrix {index.booked.shape}, {index.booked.nbytes / 2**20:.1f} MiB")
+
+    it = iter(ranges * 2)
+    print(f"memory rooms:  {timed(lambda: index.free_rooms_ids(*next(it)), args.repeat) * 1e3:.3f} ms/query")
+    it = iter(ranges * 2)
+    print(f"memory hotels: {timed(lambda: index.free_hotels_ids(*next(it)), args.repeat) * 1e3:.3f} ms/query")
+    print(f"add_booking:   {timed(lambda: index.add_booking(*bookings[0]), args.repeat) * 1e6:.1f} us")
+
+    if not args.sql:
+        return
+
+    from src.database import engine, async_session_maker
+    from src.repositories.utils import rooms_ids_for_booking
+
+    if args.seed:
+        start = time.perf_counter()
+        await seed_database(engine, data)
+        print(f"seed: {time.perf_counter() - start:.1f}s")
+
+    async with async_session_maker() as session:
+        it = iter(ranges * 2)
+
+        async def sql_query():
+            await session.execute(rooms_ids_for_booking(*next(it)))
+
+        print(f"sql rooms:     {await timed_async(sql_query, args.repeat) * 1e3:.3f} ms/query")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hotels", type=int, default=1_000)
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--sql", action="store_true", help="замерить также SQL-путь на базе из .env")
+    parser.add_argument("--seed", action="store_true", help="перезалить базу синтетическими данными")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+"""
+Проверка, что все способы поиска свободных номеров дают одно и то же: индекс в памяти,
+а с --db ещё и SQL-пути AVAILABILITY_BACKEND=sql и inventory. Эталон — прямой подсчёт
+по дням: комната свободна на [date_from, date_to], если в каждый день интервала
+забронировано меньше номеров, чем quantity. Завершается с кодом 1 при расхождении.
+
+    python -m benchmarks.availability_parity
+    python -m benchmarks.availability_parity --db   # база из .env будет перезалита
+"""
+import argparse
+import asyncio
+import random
+import sys
+from collections import Counter
+from datetime import date, timedelta
+
+from benchmarks.seed import generate_dataset, seed_database
+from src.utils.availability import AvailabilityIndex
+
+
+def free_rooms_ids_oracle(rooms, bookings, date_from: date, date_to: date, hotel_id: int | None = None) -> list[int]:
+    booked = Counter()
+    for room_id, booking_from, booking_to in bookings:
+        day = max(booking_from, date_from)
+        while day <= min(booking_to, date_to):
+            booked[room_id, day] += 1
+            day += timedelta(days=1)
+    days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+    return [
+        room_id for room_id, room_hotel_id, quantity in rooms
+        if (hotel_id is None or room_hotel_id == hotel_id)
+        and all(booked[room_id, day] < quantity for day in days)
+    ]
+
+
+async def main(args) -> int:
+    first_day = date(2024, 1, 1)
+    data = generate_dataset(
+        hotels=args.hotels, rooms=args.rooms, bookings=args.bookings, users=10,
+        days=args.days, first_day=first_day, seed=args.random_seed,
+    )
+    rooms = sorted((r[0], r[1], r[5]) for r in data.rooms)
+    bookings = [(b[2], b[3], b[4]) for b in data.bookings]
+    index = AvailabilityIndex()
+    index.build(rooms, bookings)
+
+    variants = {"memory": lambda date_from, date_to, hotel_id: index.free_rooms_ids(date_from, date_to, hotel_id)}
+    if args.db:
+        from src.database import async_session_maker, engine
+        from src.repositories.utils import free_rooms_ids_query
+
+        await seed_database(engine, data)
+        session = async_session_maker()
+
+        def sql_variant(from_inventory: bool):
+            async def run(date_from, date_to, hotel_id):
+                query = free_rooms_ids_query(by_hotel=hotel_id is not None, from_inventory=from_inventory)
+                params = {"date_from": date_from, "date_to": date_to, "hotel_id": hotel_id}
+                return sorted((await session.execute(query, params)).scalars().all())
+            return run
+
+        variants |= {"sql": sql_variant(False), "inventory": sql_variant(True)}
+
+    rnd = random.Random(args.random_seed)
+    mismatches = Counter()
+    try:
+        for _ in range(args.queries):
+            date_from = first_day + timedelta(days=rnd.randrange(-5, args.days + 5))
+            date_to = date_from + timedelta(days=rnd.randint(0, 14))
+            hotel_id = rnd.choice([None, rnd.randint(1, args.hotels)])
+            expected = free_rooms_ids_oracle(rooms, bookings, date_from, date_to, hotel_id)
+            for name, run in variants.items():
+                found = run(date_from, date_to, hotel_id)
+                if asyncio.iscoroutine(found):
+                    found = await found
+                if found != expected:
+                    mismatches[name] += 1
+                    print(f"{name}: {date_from}..{date_to} hotel={hotel_id}: "
+                          f"ожидалось {len(expected)}, найдено {len(found)}")
+    finally:
+        if args.db:
+            await session.close()
+            await engine.dispose()
+    for name in variants:
+        print(f"{name:>9}: запросов {args.queries}, расхождений {mismatches[name]}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hotels", type=int, default=10)
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--bookings", type=int, default=2_000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--db", action="store_true", help="проверить также SQL-пути на базе из .env")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,77 @@
+"""
+Много одновременных бронирований одного типа комнаты.
+
+Проверяет, что room_day_inventory не даёт продать больше номеров, чем rooms.quantity,
+и меряет пропускную способность при конкуренции за одни и те же строки.
+
+    python -m benchmarks.booking_contention --bookers 200 --quantity 20
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import select, func
+
+from benchmarks.seed import Dataset, seed_database
+from src.database import engine, async_session_maker
+from src.models.bookings import BookingOrm
+from src.schemas.bookings import BookingAdd
+from src.utils.db_manager import DBManager
+
+
+async def book(user_id: int, room_id: int, date_from: date, date_to: date, latencies: list[float]) -> bool:
+    start = time.perf_counter()
+    try:
+        async with DBManager(session_factory=async_session_maker) as db:
+            await db.bookings.add(BookingAdd(
+                user_id=user_id, room_id=room_id, date_from=date_from, date_to=date_to, price=1_000,
+            ))
+            await db.commit()
+        return True
+    except HTTPException as exc:
+        if exc.status_code != 409:
+            raise
+        return False
+    finally:
+        latencies.append(time.perf_counter() - start)
+
+
+async def main(args):
+    data = Dataset(
+        hotels=[(1, "Отель", "Город")],
+        users=[(i, f"user{i}@example.com", "") for i in range(1, args.bookers + 1)],
+        rooms=[(1, 1, "Номер", None, 1_000, args.quantity)],
+    )
+    await seed_database(engine, data)
+
+    date_from = date(2024, 8, 1)
+    date_to = date_from + timedelta(days=args.nights)
+    latencies: list[float] = []
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        book(user_id, 1, date_from, date_to, latencies) for user_id in range(1, args.bookers + 1)
+    ])
+    elapsed = time.perf_counter() - start
+
+    async with async_session_maker() as session:
+        booked = await session.scalar(select(func.count()).select_from(BookingOrm))
+    await engine.dispose()
+
+    latencies.sort()
+    print(f"bookers={args.bookers} quantity={args.quantity} elapsed={elapsed:.3f}s "
+          f"({args.bookers / elapsed:.0f} attempts/s)")
+    print(f"succeeded={sum(results)} rejected={len(results) - sum(results)} rows_in_bookings={booked}")
+    print(f"latency p50={latencies[len(latencies) // 2] * 1e3:.1f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99)] * 1e3:.1f}ms")
+    if booked > args.quantity:
+        raise SystemExit("ПЕРЕБРОНИРОВАНИЕ: продано больше номеров, чем есть")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookers", type=int, default=200)
+    parser.add_argument("--quantity", type=int, default=20)
+    parser.add_argument("--nights", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
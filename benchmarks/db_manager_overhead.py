@@ -0,0 +1,65 @@
+"""
+Накладные расходы DBManager на один запрос без обращений к БД.
+
+Сравнивает прежний вариант (сессия и все шесть репозиториев в __aenter__,
+безусловный rollback в __aexit__) с ленивым DBManager. Соединение с базой не открывается.
+
+    python -m benchmarks.db_manager_overhead
+"""
+import argparse
+import asyncio
+import time
+
+from src.database import async_session_maker
+from src.repositories.bookings import BookingsRepository
+from src.repositories.facilities import FacilitiesRepository, RoomsFacilitiesRepository
+from src.repositories.hotels import HotelsRepository
+from src.repositories.rooms import RoomsRepository
+from src.repositories.users import UsersRepository
+from src.utils.db_manager import DBManager
+
+
+class EagerDBManager:
+    """DBManager в том виде, в каком он был до ленивой инициализации."""
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    async def __aenter__(self):
+        self.session = self.session_factory()
+        self.hotels = HotelsRepository(self.session)
+        self.rooms = RoomsRepository(self.session)
+        self.users = UsersRepository(self.session)
+        self.bookings = BookingsRepository(self.session)
+        self.facilities = FacilitiesRepository(self.session)
+        self.rooms_facilities = RoomsFacilitiesRepository(self.session)
+        return self
+
+    async def __aexit__(self, *args):
+        await self.session.rollback()
+        await self.session.close()
+
+
+async def measure(factory, touch: bool, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        async with factory() as db:
+            if touch:
+                db.hotels  # Эндпоинт, которому нужен один репозиторий
+    return (time.perf_counter() - start) / repeat
+
+
+async def main(args):
+    eager = lambda: EagerDBManager(session_factory=async_session_maker)  # noqa: E731
+    lazy = lambda: DBManager(session_factory=async_session_maker)  # noqa: E731
+    for touch in (False, True):
+        label = "один репозиторий" if touch else "без обращений"
+        before = await measure(eager, touch, args.repeat)
+        after = await measure(lazy, touch, args.repeat)
+        print(f"{label:>16}: eager {before * 1e6:7.1f} us, lazy {after * 1e6:7.1f} us, x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20_000)
+    asyncio.run(main(parser.parse_args()))
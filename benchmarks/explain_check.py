@@ -0,0 +1,85 @@
+"""
+Проверка планов горячих запросов: EXPLAIN на засеянной базе не должен показывать
+Seq Scan по таблицам, для которых есть индексы. Завершается с кодом 1, если показывает,
+поэтому годится как регрессионная проверка после миграций и правок запросов.
+
+    python -m benchmarks.explain_check --seed   # база из .env будет перезалита
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import select, text
+
+from benchmarks.seed import generate_dataset, seed_database
+from src.models.bookings import BookingOrm
+from src.models.facilities import RoomsFacilitiesOrm
+from src.models.rooms import RoomsORM
+from src.repositories.mappers.mappers import BookingDataMapper
+from src.repositories.utils import rooms_ids_for_booking
+
+
+def hot_queries(day: date) -> list[tuple[str, object, set[str]]]:
+    """(название, запрос, таблицы, которые нельзя читать целиком)."""
+    return [
+        ("свободные комнаты",
+         rooms_ids_for_booking(day, day + timedelta(days=7)),
+         {"bookings"}),
+        ("свободные комнаты отеля",
+         rooms_ids_for_booking(day, day + timedelta(days=7), hotel_id=1),
+         {"bookings"}),
+        ("комнаты отеля",
+         select(RoomsORM.id).filter_by(hotel_id=1),
+         {"rooms"}),
+        ("бронирования пользователя",
+         select(*BookingDataMapper.columns()).filter_by(user_id=1).order_by(BookingOrm.id).limit(5),
+         {"bookings"}),
+        ("бронирования комнаты за период",
+         select(BookingOrm.id).filter(
+             BookingOrm.room_id == 1,
+             BookingOrm.date_from <= day + timedelta(days=7),
+             BookingOrm.date_to >= day,
+         ),
+         {"bookings"}),
+        ("удобства комнаты",
+         select(RoomsFacilitiesOrm.facility_id).filter_by(room_id=1),
+         {"rooms_facilities"}),
+    ]
+
+
+def seq_scans(plan: dict) -> list[str]:
+    tables = [plan["Relation Name"]] if plan["Node Type"] == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        tables += seq_scans(child)
+    return tables
+
+
+async def main(args) -> int:
+    from src.database import engine
+
+    if args.seed:
+        await seed_database(engine, generate_dataset(hotels=args.hotels, rooms=args.rooms, bookings=args.bookings))
+
+    failed = 0
+    async with engine.connect() as conn:
+        for name, query, forbidden in hot_queries(date(2024, 6, 1)):
+            sql = query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+            plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar_one()[0]["Plan"]
+            bad = sorted(set(seq_scans(plan)) & forbidden)
+            if bad:
+                failed += 1
+                print(f"FAIL {name}: Seq Scan по {', '.join(bad)}")
+            else:
+                print(f"ok   {name}: {plan['Node Type']}, cost {plan['Total Cost']}")
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hotels", type=int, default=1_000)
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--seed", action="store_true", help="перезалить базу синтетическими данными")
+    sys.exit(asyncio.run(main(parser.parse_args())))
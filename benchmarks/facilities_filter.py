@@ -0,0 +1,99 @@
+"""
+Фильтр "комнаты со всеми этими удобствами": JOIN rooms_facilities с GROUP BY/HAVING
+против побитовой проверки rooms.facilities_mask и масок в памяти (FacilitiesIndex).
+Наборы удобств случайные, одинаковые для всех способов; печатает время на запрос
+и проверяет, что все способы находят одни и те же комнаты.
+
+    python -m benchmarks.facilities_filter --seed   # база из .env будет перезалита, 100k комнат
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import func, select
+
+from benchmarks.seed import generate_dataset, seed_database
+from src.models.facilities import RoomsFacilitiesOrm
+from src.models.rooms import RoomsORM
+from src.utils.facilities_bitset import FacilitiesIndex, facilities_mask
+
+
+def join_query(facilities_ids: set[int], hotel_id: int | None):
+    rooms_ids = (
+        select(RoomsFacilitiesOrm.room_id)
+        .filter(RoomsFacilitiesOrm.facility_id.in_(facilities_ids))
+        .group_by(RoomsFacilitiesOrm.room_id)
+        .having(func.count(RoomsFacilitiesOrm.facility_id.distinct()) == len(facilities_ids))
+    )
+    query = select(RoomsORM.id).filter(RoomsORM.id.in_(rooms_ids))
+    return query.filter_by(hotel_id=hotel_id) if hotel_id is not None else query
+
+
+def mask_query(facilities_ids: set[int], hotel_id: int | None):
+    required = facilities_mask(facilities_ids)
+    query = select(RoomsORM.id).filter(RoomsORM.facilities_mask.bitwise_and(required) == required)
+    return query.filter_by(hotel_id=hotel_id) if hotel_id is not None else query
+
+
+async def main(args):
+    from src.database import async_session_maker, engine
+
+    if args.seed:
+        await seed_database(engine, generate_dataset(
+            hotels=args.hotels, rooms=args.rooms, bookings=args.bookings, facilities=args.facilities,
+        ))
+
+    rnd = random.Random(args.random_seed)
+    cases = [
+        (set(rnd.sample(range(1, args.facilities + 1), rnd.randint(1, 3))),
+         rnd.randint(1, args.hotels) if args.per_hotel else None)
+        for _ in range(args.repeat)
+    ]
+    async with async_session_maker() as session:
+        index = FacilitiesIndex()
+        start = time.perf_counter()
+        await index.load(session)
+        print(f"загрузка индекса: {(time.perf_counter() - start) * 1e3:.1f} мс, {len(index.room_ids)} комнат")
+
+        async def run_sql(build):
+            return sorted((await session.execute(build(facilities_ids, hotel_id))).scalars().all())
+
+        async def run_memory():
+            return sorted(index.rooms_ids(facilities_mask(facilities_ids), hotel_id))
+
+        variants = {
+            "join": lambda: run_sql(join_query),
+            "mask": lambda: run_sql(mask_query),
+            "memory": run_memory,
+        }
+        timings = {name: [] for name in variants}
+        for facilities_ids, hotel_id in cases:
+            found = {}
+            for name, run in variants.items():
+                start = time.perf_counter()
+                found[name] = await run()
+                timings[name].append(time.perf_counter() - start)
+            if len({tuple(ids) for ids in found.values()}) != 1:
+                raise SystemExit(f"Разные результаты для {sorted(facilities_ids)}: "
+                                 + ", ".join(f"{name}={len(ids)}" for name, ids in found.items()))
+
+    for name, values in timings.items():
+        print(f"{name:>7}: {statistics.fmean(values) * 1e3:8.2f} мс/запрос, "
+              f"p95 {sorted(values)[int(len(values) * 0.95)] * 1e3:8.2f} мс")
+    print(f"mask быстрее join в {statistics.fmean(timings['join']) / statistics.fmean(timings['mask']):.1f} раз")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hotels", type=int, default=1_000)
+    parser.add_argument("--rooms", type=int, default=100_000)
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--facilities", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--per-hotel", action="store_true", help="фильтровать ещё и по отелю, как GET /hotels/{id}/rooms")
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--seed", action="store_true", help="перезалить базу синтетическими данными")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Задержка посторонних запросов во время волны логинов.
+
+Параллельно с пачкой проверок bcrypt (как в /auth/login) опрашивает лёгкий эндпоинт
+/auth/logout через ASGI-транспорт и печатает его p50/p99 в двух режимах:
+sync — проверка прямо в event loop (старое поведение), async — через пул password_hasher.
+База данных не нужна.
+
+    python -m benchmarks.login_latency --logins 200
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from src.main import app
+from src.services.auth import AuthService, password_hasher
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list[float], interval: float) -> None:
+    # Задержку считаем от запланированного момента отправки, а не от фактического:
+    # иначе время, пока event loop заблокирован, в замеры не попадает
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+        await client.post("/auth/logout")
+        latencies.append(time.perf_counter() - scheduled)
+        scheduled += interval
+
+
+async def login_storm(mode: str, logins: int, concurrency: int, hashed: str) -> None:
+    service = AuthService()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            if mode == "sync":
+                service.verify_password("password", hashed)
+                await asyncio.sleep(0)
+            else:
+                await service.verify_password_async("password", hashed)
+
+    await asyncio.gather(*[login() for _ in range(logins)])
+
+
+async def run(mode: str, args, hashed: str) -> None:
+    latencies: list[float] = []
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        probes = [asyncio.create_task(probe(client, stop, latencies, args.interval)) for _ in range(args.probes)]
+        start = time.perf_counter()
+        await login_storm(mode, args.logins, args.concurrency, hashed)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*probes)
+    print(f"{mode:>5}: logins {args.logins / elapsed:6.1f}/s, probe requests {len(latencies):5d}, "
+          f"p50 {percentile(latencies, 0.5) * 1e3:7.2f}ms, p99 {percentile(latencies, 0.99) * 1e3:7.2f}ms")
+
+
+async def main(args):
+    hashed = AuthService().hash_password("password")
+    for mode in ("sync", "async"):
+        await run(mode, args, hashed)
+    print(password_hasher.stats())
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--probes", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=0.01, help="пауза между запросами одного пробника, с")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,44 @@
+"""
+Преобразование строк бронирований в схемы: по одной через model_validate
+против пакетного DataMapper.map_rows_to_domain_entities. БД не нужна.
+
+    python -m benchmarks.mapping --rows 100000
+"""
+import argparse
+import time
+from datetime import date
+
+from sqlalchemy.engine.result import SimpleResultMetaData
+from sqlalchemy.engine.row import Row
+
+from src.repositories.mappers.mappers import BookingDataMapper
+from src.schemas.bookings import Booking
+
+
+def make_rows(count: int) -> list[Row]:
+    metadata = SimpleResultMetaData(list(Booking.model_fields))
+    return [
+        Row(metadata, metadata._processors, metadata._key_to_index,
+            (i % 1000, i % 10_000, date(2024, 8, 1), date(2024, 8, 8), 5_000, i))
+        for i in range(count)
+    ]
+
+
+def main(args):
+    rows = make_rows(args.rows)
+    variants = {
+        "model_validate по строке": lambda: [Booking.model_validate(row, from_attributes=True) for row in rows],
+        "model_construct по строке": lambda: [Booking.model_construct(**row._mapping) for row in rows],
+        "пакетно (TypeAdapter)": lambda: BookingDataMapper.map_rows_to_domain_entities(rows),
+    }
+    for name, func in variants.items():
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>26}: {elapsed:.3f}s, {args.rows / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    main(parser.parse_args())
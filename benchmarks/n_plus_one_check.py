@@ -0,0 +1,73 @@
+"""
+Проверка числа SQL-запросов у методов репозиториев, которые подгружают связи.
+
+Для отелей с разным числом комнат RoomsRepository.get_filtered_by_time (joinedload)
+и get_one_or_none_with_rels (selectinload) должны делать одинаковое число запросов
+и не повторять одну форму запроса. Иначе — код 1: связи грузятся по одной (N+1).
+
+    python -m benchmarks.n_plus_one_check --seed   # база из .env будет перезалита
+"""
+import argparse
+import asyncio
+import sys
+from collections import Counter
+from datetime import date
+
+from benchmarks.seed import generate_dataset, seed_database
+from src.database import engine, async_session_maker
+from src.utils import diagnostics
+from src.utils.db_manager import DBManager
+
+
+async def count_statements(call) -> diagnostics.StatementLog:
+    async with DBManager(session_factory=async_session_maker) as db:
+        with diagnostics.capture_statements() as log:
+            await call(db)
+    return log
+
+
+async def main(args) -> int:
+    diagnostics.install(engine)
+    data = generate_dataset(hotels=args.hotels, rooms=args.rooms, bookings=args.bookings)
+    if args.seed:
+        await seed_database(engine, data)
+
+    # Самый маленький и самый большой отели: число запросов не должно зависеть от числа комнат
+    rooms_per_hotel = Counter(room[1] for room in data.rooms)
+    (big_hotel, _), *_, (small_hotel, _) = rooms_per_hotel.most_common()
+    room_with_facilities = data.rooms_facilities[0][1]
+    checks = {
+        "RoomsRepository.get_filtered_by_time": [
+            lambda db, hotel_id=hotel_id: db.rooms.get_filtered_by_time(hotel_id, date(2024, 6, 1), date(2024, 6, 8))
+            for hotel_id in (small_hotel, big_hotel)
+        ],
+        "RoomsRepository.get_one_or_none_with_rels": [
+            lambda db, room_id=room_id: db.rooms.get_one_or_none_with_rels(id=room_id)
+            for room_id in (data.rooms[0][0], room_with_facilities)
+        ],
+    }
+
+    failed = 0
+    for name, calls in checks.items():
+        await count_statements(calls[0])  # Прогрев: загрузка индекса свободных номеров и т.п.
+        logs = [await count_statements(call) for call in calls]
+        counts = [log.count for log in logs]
+        problems = [problem for log in logs for problem in log.problems(repeat_limit=2)]
+        if len(set(counts)) > 1 or problems:
+            failed += 1
+            print(f"FAIL {name}: запросов {counts}")
+            for problem in problems:
+                print(f"     {problem}")
+        else:
+            print(f"ok   {name}: {counts[0]} запрос(а)")
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hotels", type=int, default=100)
+    parser.add_argument("--rooms", type=int, default=2_000)
+    parser.add_argument("--bookings", type=int, default=10_000)
+    parser.add_argument("--seed", action="store_true", help="перезалить базу синтетическими данными")
+    sys.exit(asyncio.run(main(parser.parse_args())))
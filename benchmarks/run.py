@@ -0,0 +1,199 @@
+"""
+Нагрузочный прогон ключевых эндпоинтов приложения.
+
+Гоняет настоящее приложение из src/main.py через ASGI-транспорт httpx в том же процессе
+(или, с --url, запущенный uvicorn) и для каждого сценария считает пропускную способность
+и p50/p95/p99 задержки. Результаты сохраняются в JSON, чтобы сравнивать их между коммитами.
+База берётся из .env; с --seed она перезаливается синтетическими данными (см. seed.py).
+
+    python -m benchmarks.run --seed
+    python -m benchmarks.run --scenarios hotels rooms --requests 2000 --concurrency 50
+    python -m benchmarks.run --compare benchmarks/results/<коммит>.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from benchmarks.seed import generate_dataset, seed_database
+
+FIRST_DAY = date(2024, 1, 1)
+EMAIL, PASSWORD = "user1@example.com", "password"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def random_period(rnd: random.Random, days: int) -> dict:
+    date_from = FIRST_DAY + timedelta(days=rnd.randrange(days))
+    return {"date_from": str(date_from), "date_to": str(date_from + timedelta(days=rnd.randint(1, 14)))}
+
+
+# Сценарий: функция (client, rnd, args) -> ответ; коды из OK_STATUSES ошибкой не считаются
+def get_hotels(client, rnd, args):
+    return client.get("/hotels", params=random_period(rnd, args.days) | {"per_page": 10})
+
+
+def get_rooms(client, rnd, args):
+    return client.get(f"/hotels/{rnd.randint(1, args.hotels)}/rooms", params=random_period(rnd, args.days))
+
+
+def search_rooms(client, rnd, args):
+    return client.get("/rooms/search", params=random_period(rnd, args.days) | {
+        "location": f"Город {rnd.randrange(100)},", "guests": rnd.randint(1, 3),
+    })
+
+
+def post_booking(client, rnd, args):
+    return client.post("/bookings", json=random_period(rnd, args.days) | {"room_id": rnd.randint(1, args.rooms)})
+
+
+def post_login(client, rnd, args):
+    return client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+
+
+SCENARIOS = {
+    "hotels": ("GET /hotels", get_hotels),
+    "rooms": ("GET /hotels/{id}/rooms", get_rooms),
+    "search": ("GET /rooms/search", search_rooms),
+    "bookings": ("POST /bookings", post_booking),
+    "login": ("POST /auth/login", post_login),
+}
+# 409 — нормальный исход бронирования, когда номера кончились
+OK_STATUSES = {200, 409}
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario, args) -> dict:
+    rnd = random.Random(args.random_seed)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(args.requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await scenario(client, rnd, args)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if status not in OK_STATUSES),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1e3,
+        "p50_ms": percentile(latencies, 0.5) * 1e3,
+        "p95_ms": percentile(latencies, 0.95) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+    }
+
+
+async def seed(args) -> None:
+    from src.database import engine
+    from src.services.auth import AuthService
+
+    data = generate_dataset(
+        hotels=args.hotels, rooms=args.rooms, bookings=args.bookings,
+        users=args.users, facilities=args.facilities, days=args.days, first_day=FIRST_DAY,
+    )
+    # Первому пользователю — настоящий пароль, под ним логинимся и бронируем
+    data.users[0] = (1, EMAIL, AuthService().hash_password(PASSWORD))
+    start = time.perf_counter()
+    await seed_database(engine, data)
+    print(f"seed: {time.perf_counter() - start:.1f}s")
+
+
+async def bench(args) -> dict:
+    from src.main import app
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url)
+        else:
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+        async with client:
+            login = await post_login(client, None, args)
+            login.raise_for_status()  # Заодно кладёт access_token в cookies клиента для POST /bookings
+            for _ in range(args.warmup):
+                await get_hotels(client, random.Random(), args)
+            for name in args.scenarios:
+                title, scenario = SCENARIOS[name]
+                results[title] = await run_scenario(client, scenario, args)
+                r = results[title]
+                print(f"{title:>24}: {r['throughput_rps']:8.1f} rps, p50 {r['p50_ms']:7.2f}ms, "
+                      f"p95 {r['p95_ms']:7.2f}ms, p99 {r['p99_ms']:7.2f}ms, errors {r['errors']}")
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"\nпротив {baseline_path.name} ({baseline.get('commit')}):")
+    for title, r in results.items():
+        old = baseline["scenarios"].get(title)
+        if old is None:
+            continue
+        print(f"{title:>24}: rps x{r['throughput_rps'] / old['throughput_rps']:.2f}, "
+              f"p99 {old['p99_ms']:.2f} -> {r['p99_ms']:.2f}ms")
+
+
+async def main(args):
+    if args.seed:
+        await seed(args)
+    results = await bench(args)
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "scenarios": results,
+    }
+    output = args.output or RESULTS_DIR / f"{commit or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"результаты: {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1_000, help="запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=50, help="запросов до замеров")
+    parser.add_argument("--url", help="гонять запущенный сервер вместо ASGI-транспорта")
+    parser.add_argument("--seed", action="store_true", help="перезалить базу синтетическими данными")
+    parser.add_argument("--hotels", type=int, default=1_000)
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--facilities", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365, help="горизонт дат бронирований и запросов")
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help=f"куда сохранить JSON (по умолчанию {RESULTS_DIR}/<коммит>.json)")
+    parser.add_argument("--compare", type=Path, help="JSON прошлого прогона для сравнения")
+    asyncio.run(main(parser.parse_args()))
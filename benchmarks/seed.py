@@ -0,0 +1,92 @@
+"""
+Генератор синтетического набора данных для бенчмарков.
+
+Данные заливаются через COPY в базу из настроек (.env), поэтому DB_NAME должен
+указывать на отдельную, временную базу: таблицы перед заливкой очищаются.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+TABLES = ("bookings", "rooms_facilities", "facilities", "rooms", "hotels", "users")
+
+
+@dataclass
+class Dataset:
+    hotels: list[tuple] = field(default_factory=list)  # (id, title, location)
+    users: list[tuple] = field(default_factory=list)  # (id, email, hashed_password)
+    rooms: list[tuple] = field(default_factory=list)  # (id, hotel_id, title, description, price, quantity)
+    bookings: list[tuple] = field(default_factory=list)  # (id, user_id, room_id, date_from, date_to, price)
+    facilities: list[tuple] = field(default_factory=list)  # (id, title)
+    rooms_facilities: list[tuple] = field(default_factory=list)  # (id, room_id, facility_id)
+
+
+def generate_dataset(
+        hotels: int = 1_000,
+        rooms: int = 10_000,
+        bookings: int = 100_000,
+        users: int = 1_000,
+        days: int = 365,
+        first_day: date = date(2024, 1, 1),
+        facilities: int = 20,
+        seed: int = 42,
+) -> Dataset:
+    rnd = random.Random(seed)
+    data = Dataset()
+    data.hotels = [(i, f"Отель {i}", f"Город {i % 100}, ул. {i}") for i in range(1, hotels + 1)]
+    data.users = [(i, f"user{i}@example.com", "") for i in range(1, users + 1)]
+    data.rooms = [
+        (i, rnd.randint(1, hotels), f"Номер {i}", None, rnd.randint(1_000, 20_000), rnd.randint(1, 10))
+        for i in range(1, rooms + 1)
+    ]
+    for i in range(1, bookings + 1):
+        room = data.rooms[rnd.randrange(rooms)]
+        date_from = first_day + timedelta(days=rnd.randrange(days))
+        date_to = date_from + timedelta(days=rnd.randint(1, 14))
+        data.bookings.append((i, rnd.randint(1, users), room[0], date_from, date_to, room[4]))
+    data.facilities = [(i, f"Удобство {i}") for i in range(1, facilities + 1)]
+    for room in data.rooms:
+        for facility_id in rnd.sample(range(1, facilities + 1), rnd.randint(0, min(5, facilities))):
+            data.rooms_facilities.append((len(data.rooms_facilities) + 1, room[0], facility_id))
+    return data
+
+
+async def seed_database(engine, data: Dataset) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+        raw = await conn.get_raw_connection()
+        copy = raw.driver_connection.copy_records_to_table
+        await copy("hotels", records=data.hotels, columns=["id", "title", "location"])
+        await copy("users", records=data.users, columns=["id", "email", "hashed_password"])
+        await copy("rooms", records=data.rooms,
+                   columns=["id", "hotel_id", "title", "description", "price", "quantity"])
+        await copy("bookings", records=data.bookings,
+                   columns=["id", "user_id", "room_id", "date_from", "date_to", "price"])
+        await copy("facilities", records=data.facilities, columns=["id", "title"])
+        await copy("rooms_facilities", records=data.rooms_facilities, columns=["id", "room_id", "facility_id"])
+        for table in TABLES:
+            await conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                                    f"(SELECT coalesce(max(id), 1) FROM {table}))"))
+        # Остатки по дням для уже залитых бронирований, как в миграции room_day_inventory
+        await conn.execute(text("""
+            INSERT INTO room_day_inventory (room_id, day, rooms_left)
+            SELECT r.id, d.day::date, r.quantity - count(*)
+            FROM bookings b
+            JOIN rooms r ON r.id = b.room_id
+            CROSS JOIN LATERAL generate_series(b.date_from, b.date_to, interval '1 day') AS d(day)
+            GROUP BY r.id, r.quantity, d.day
+        """))
+        # Маски удобств комнат, как в миграции rooms_facilities_mask
+        await conn.execute(text("""
+            UPDATE rooms SET facilities_mask = masks.mask
+            FROM (
+                SELECT room_id, bit_or(1::bigint << (facility_id - 1)) AS mask
+                FROM rooms_facilities
+                WHERE facility_id BETWEEN 1 AND 63
+                GROUP BY room_id
+            ) AS masks
+            WHERE rooms.id = masks.room_id
+        """))
+        await conn.execute(text(f"ANALYZE {', '.join(TABLES)}, room_day_inventory"))
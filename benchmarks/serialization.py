@@ -0,0 +1,88 @@
+"""
+Сериализация больших ответов: стандартный путь FastAPI (валидация, dict, json.dumps)
+против FastJSONRoute (TypeAdapter.dump_json сразу в байты). БД не нужна: эндпоинты
+отдают заранее собранные списки схем, приложение вызывается напрямую по ASGI.
+Печатает запросы и мегабайты ответа в секунду на один процесс.
+
+    python -m benchmarks.serialization --items 1000
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from fastapi import APIRouter, FastAPI
+
+from src.schemas.bookings import Booking
+from src.schemas.hotels import Hotel
+from src.utils.responses import FastJSONResponse, FastJSONRoute
+
+
+def make_app(items: int) -> FastAPI:
+    hotels = [Hotel(id=i, title=f"Отель {i}", location=f"Город {i % 100}, ул. {i}") for i in range(items)]
+    bookings = [
+        Booking(id=i, user_id=i % 1000, room_id=i % 10_000, date_from=date(2024, 8, 1), date_to=date(2024, 8, 8),
+                price=5_000)
+        for i in range(items)
+    ]
+    app = FastAPI()
+    for prefix, route_class, response_class in (
+            ("/default", None, None),
+            ("/fast", FastJSONRoute, FastJSONResponse),
+    ):
+        router = APIRouter(prefix=prefix, **({"route_class": route_class} if route_class else {}))
+
+        @router.get("/hotels", response_model=list[Hotel])
+        async def get_hotels():
+            return hotels
+
+        @router.get("/bookings", response_model=list[Booking])
+        async def get_bookings():
+            return bookings
+
+        app.include_router(router, **({"default_response_class": response_class} if response_class else {}))
+    return app
+
+
+async def call(app, path: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "server": ("bench", 80), "client": ("bench", 1),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def main(args):
+    app = make_app(args.items)
+    for resource in ("hotels", "bookings"):
+        results = {}
+        for variant in ("default", "fast"):
+            path = f"/{variant}/{resource}"
+            size = await call(app, path)  # Прогрев
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                await call(app, path)
+            elapsed = time.perf_counter() - start
+            results[variant] = elapsed
+            print(f"{resource:>8} {variant:>7}: {args.repeat / elapsed:8.1f} req/s, "
+                  f"{size * args.repeat / elapsed / 2**20:7.1f} MiB/s ({size} bytes/response)")
+        print(f"{resource:>8} speedup: x{results['default'] / results['fast']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1_000, help="элементов в ответе")
+    parser.add_argument("--repeat", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
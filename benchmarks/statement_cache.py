@@ -0,0 +1,53 @@
+"""
+Цена подготовки запроса на стороне Python: сборка дерева выражения заново на каждый запрос
+(как раньше) против готового шаблона из statement_templates. Для каждого варианта считается
+то, что SQLAlchemy делает до обращения к кэшу скомпилированных запросов: сборка и ключ кэша.
+БД не нужна.
+
+    python -m benchmarks.statement_cache --repeat 2000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from src.repositories.utils import free_rooms_ids_query
+from src.utils.statement_cache import StatementTemplates
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(args):
+    rnd = random.Random(1)
+    templates = StatementTemplates()
+
+    def period():
+        date_from = date(2024, 1, 1) + timedelta(days=rnd.randrange(365))
+        return date_from, date_from + timedelta(days=rnd.randint(1, 14)), rnd.randint(1, 1_000)
+
+    def rebuilt():
+        period()
+        query = free_rooms_ids_query(by_hotel=True)
+        return query._generate_cache_key()
+
+    def template():
+        period()  # Те же накладные расходы на случайные значения
+        query = templates.get(("free_rooms_ids", True), lambda: free_rooms_ids_query(by_hotel=True))
+        return query._generate_cache_key()
+
+    rebuilt_time = timed(rebuilt, args.repeat)
+    template_time = timed(template, args.repeat)
+    print(f"сборка заново: {rebuilt_time * 1e6:8.1f} мкс/запрос")
+    print(f"шаблон:        {template_time * 1e6:8.1f} мкс/запрос")
+    print(f"быстрее в {rebuilt_time / template_time:.1f} раз")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2_000)
+    main(parser.parse_args())
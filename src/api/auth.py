@@ -16,7 +16,7 @@ async def register_user(
         data: UserRequestAdd,  # Данные запроса (email и пароль), валидируемые через Pydantic-схему
 ):
     # Хешируем пароль, чтобы его безопасно хранить в базе данных
-    hashed_password = AuthService().hash_password(data.password)
+    hashed_password = await AuthService().hash_password_async(data.password)
 
     # Создаем объект для нового пользователя
     new_user_data = UserAdd(email=data.email, hashed_password=hashed_password)
@@ -42,18 +42,19 @@ async def login_user(
     async with async_session_maker() as session:
         # Получаем пользователя и его хешированный пароль из базы данных
         user = await UsersRepository(session).get_user_with_hashed_password(email=data.email)
-        # Если пользователь не найден, возвращаем ошибку авторизации
-        if not user:
-            raise HTTPException(status_code=401, detail="Авторизация не выполнена")
-        # Проверяем соответствие пароля, используя сервис AuthService
-        if not AuthService().verify_password(data.password, user.hashed_password):
-            raise HTTPException(status_code=401, detail="Пароль не верный")
-        # Генерируем JWT-токен для авторизованного пользователя
-        access_token = AuthService().create_access_token({"user_id": user.id})
-        # Устанавливаем токен в cookies ответа
-        response.set_cookie("access_token", access_token)
-        # Возвращаем токен в теле ответа
-        return {"access_token": access_token}
+    # Если пользователь не найден, возвращаем ошибку авторизации
+    if not user:
+        raise HTTPException(status_code=401, detail="Авторизация не выполнена")
+    # Проверяем соответствие пароля уже после закрытия сессии, чтобы не держать соединение с БД,
+    # пока bcrypt ждёт своей очереди в пуле
+    if not await AuthService().verify_password_async(data.password, user.hashed_password):
+        raise HTTPException(status_code=401, detail="Пароль не верный")
+    # Генерируем JWT-токен для авторизованного пользователя
+    access_token = AuthService().create_access_token({"user_id": user.id})
+    # Устанавливаем токен в cookies ответа
+    response.set_cookie("access_token", access_token)
+    # Возвращаем токен в теле ответа
+    return {"access_token": access_token}
 
 
 # Эндпоинт для получения информации о текущем пользователе
@@ -1,32 +1,68 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from src.api.dependencies import DBDep, UserIdDep  # Зависимости для базы данных и идентификатора пользователя
+from src.api.dependencies import DBDep, DBReadDep, UserIdDep, PaginationDep  # Зависимости для БД, пользователя и пагинации
+from src.api.dependencies import AdminIdDep, get_db_manager
+from src.config import settings
 from src.schemas.bookings import BookingAddRequest, BookingAdd  # Pydantic-схемы для работы с запросами на бронирование
+from src.schemas.bookings import Booking, BookingsImportResult
+from src.schemas.status import DataResponse
+from src.utils.bulk_import import CSV, NDJSON, read_batches, request_body_openapi
+from src.utils.pagination import next_cursor
+from src.utils.responses import FastJSONRoute
 
 # Создаем маршрутизатор для работы с бронированиями
-router = APIRouter(prefix="/bookings", tags=['Бронирование'])
+router = APIRouter(prefix="/bookings", tags=['Бронирование'], route_class=FastJSONRoute)
+
+
+async def stream_bookings(cursor: str | None):
+    # Зависимости с yield закрываются до отправки ответа, поэтому у потока своя сессия
+    async with get_db_manager(read_only=True) as db:
+        async for bookings in db.bookings.stream_filtered(fetch_size=settings.STREAM_FETCH_SIZE, cursor=cursor):
+            yield "".join(booking.model_dump_json() + "\n" for booking in bookings)
 
 
 # Эндпоинт для получения всех бронирований
-@router.get("")
-async def get_booking(db: DBDep):  # Используем зависимость для базы данных
+@router.get("", response_model=list[Booking])
+async def get_booking(
+        db: DBReadDep,
+        pagination: PaginationDep,
+        request: Request,
+        response: Response,
+        stream: bool = Query(False, description="Отдать построчно в NDJSON (то же, что Accept: application/x-ndjson)"),
+):
     """
     Возвращает список всех бронирований.
+    С per_page или cursor отдаёт постранично, курсор следующей страницы — в заголовке X-Next-Cursor.
+    В потоковом режиме отдаёт все бронирования после cursor по одному JSON-объекту на строку.
     """
-    return await db.bookings.get_all()  # Вызываем метод репозитория для получения всех записей бронирований
+    if stream or NDJSON in request.headers.get("accept", ""):
+        return StreamingResponse(stream_bookings(pagination.cursor), media_type=NDJSON)
+
+    bookings = await db.bookings.get_all(limit=pagination.per_page, cursor=pagination.cursor)
+    if cursor := next_cursor(bookings, pagination.per_page):
+        response.headers["X-Next-Cursor"] = cursor
+    return bookings
 
 
 # Эндпоинт для получения бронирований текущего пользователя
-@router.get("/me")
-async def get_booking(user_id: UserIdDep, db: DBDep):
+@router.get("/me", response_model=list[Booking])
+async def get_booking(user_id: UserIdDep, db: DBReadDep, pagination: PaginationDep, response: Response):
     """
     Возвращает список бронирований, связанных с текущим пользователем.
     """
-    return await db.bookings.get_filtered(user_id=user_id)  # Фильтруем бронирования по user_id
+    bookings = await db.bookings.get_filtered(  # Фильтруем бронирования по user_id
+        user_id=user_id,
+        limit=pagination.per_page,
+        cursor=pagination.cursor,
+    )
+    if cursor := next_cursor(bookings, pagination.per_page):
+        response.headers["X-Next-Cursor"] = cursor
+    return bookings
 
 
 # Эндпоинт для создания нового бронирования
-@router.post("")
+@router.post("", response_model=DataResponse[Booking])
 async def add_booking(
         user_id: UserIdDep,  # ID текущего пользователя, извлекается через токен
         db: DBDep,  # Объект для работы с базой данных
@@ -61,3 +97,27 @@ async def add_booking(
     # Возвращаем успешный ответ с данными о созданном бронировании
     return {"status": "Ok", "data": booking}
 
+
+def check_imported_booking(booking: BookingAdd) -> str | None:
+    if booking.date_to < booking.date_from:
+        return "Дата выезда раньше даты заезда"
+    if booking.price < 0:
+        return "Отрицательная цена"
+    return None
+
+
+# Эндпоинт для массового импорта бронирований
+@router.post("/import", response_model=BookingsImportResult, openapi_extra=request_body_openapi(BookingAdd))
+async def import_bookings(admin_id: AdminIdDep, request: Request, db: DBDep):
+    """
+    Импортирует бронирования из NDJSON или CSV через COPY, пачками по IMPORT_CHUNK_SIZE.
+    Только для администраторов (ADMIN_USER_IDS): user_id и price берутся из файла как есть.
+    Тело читается потоком; импорт идёт одной транзакцией: при ошибке в любой строке — 422 и ничего не сохраняется.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if media_type not in (NDJSON, CSV):
+        raise HTTPException(status_code=415, detail=f"Ожидается {NDJSON} или {CSV}")
+    batches = read_batches(request.stream(), media_type, BookingAdd, settings.IMPORT_CHUNK_SIZE, check=check_imported_booking)
+    chunks = await db.bookings.import_bulk(batches)
+    await db.commit()
+    return {"status": "Ok", "imported": sum(chunk["rows"] for chunk in chunks), "chunks": chunks}
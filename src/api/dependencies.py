@@ -1,8 +1,10 @@
+import hmac
 from typing import Annotated
 
 from fastapi import Depends, Query, HTTPException, Request
 from pydantic import BaseModel
 
+from src.config import settings
 from src.database import async_session_maker
 from src.services.auth import AuthService
 from src.utils.db_manager import DBManager
@@ -11,6 +13,7 @@ from src.utils.db_manager import DBManager
 class PaginationParams(BaseModel):
     page: Annotated[int | None, Query(1, ge=1)]
     per_page: Annotated[int | None, Query(None, ge=1, lt=30)]
+    cursor: Annotated[str | None, Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor")]
 
 
 PaginationDep = Annotated[PaginationParams, Depends()]
@@ -24,15 +27,33 @@ def get_token(request: Request) -> str:
 
 
 def get_current_user_id(token: str = Depends(get_token)) -> int:
-    data = AuthService().encode_token(token)
+    data = AuthService().encode_token_cached(token)
     return data["user_id"]
 
 
 UserIdDep = Annotated[int, Depends(get_current_user_id)]
 
 
-def get_db_manager():
-    return DBManager(session_factory=async_session_maker)
+def get_admin_user_id(user_id: UserIdDep) -> int:
+    if user_id not in settings.ADMIN_USER_IDS:
+        raise HTTPException(status_code=403, detail="Недостаточно прав")
+    return user_id
+
+
+AdminIdDep = Annotated[int, Depends(get_admin_user_id)]
+
+
+def check_internal_access(request: Request) -> None:
+    """Доступ к служебным эндпоинтам: по INTERNAL_API_TOKEN или администратору."""
+    token = settings.INTERNAL_API_TOKEN
+    authorization = request.headers.get("authorization", "")
+    if token and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        return
+    get_admin_user_id(get_current_user_id(get_token(request)))
+
+
+def get_db_manager(read_only: bool = False):
+    return DBManager(session_factory=async_session_maker, read_only=read_only)
 
 
 async def get_db():
@@ -40,4 +61,11 @@ async def get_db():
         yield db
 
 
+async def get_db_readonly():
+    async with get_db_manager(read_only=True) as db:
+        yield db
+
+
 DBDep = Annotated[DBManager, Depends(get_db)]
+# Для эндпоинтов, которые только читают: транзакция READ ONLY
+DBReadDep = Annotated[DBManager, Depends(get_db_readonly)]
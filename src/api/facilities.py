@@ -1,9 +1,11 @@
 
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Request, Response
 
-from src.api.dependencies import DBDep
+from src.api.dependencies import DBDep, DBReadDep, PaginationDep
 
 from src.schemas.facilities import FacilityAdd
+from src.utils.etag import ALL, conditional_get
+from src.utils.pagination import next_cursor
 
 router = APIRouter(prefix="/facilities", tags=["Удобства"])
 
@@ -11,8 +13,16 @@ router = APIRouter(prefix="/facilities", tags=["Удобства"])
 @router.get("",
             summary="Получение данных о комфорте в комнатах",
             description="<h1>Тут мы получаем данные о комфорте в комнатах</h1>", )
-async def get_facilities(db: DBDep, ):
-    return await db.facilities.get_all()
+async def get_facilities(db: DBReadDep, pagination: PaginationDep, request: Request, response: Response):
+    facilities = await conditional_get(
+        request, response, [("facilities", ALL)],
+        lambda: db.facilities.get_all(limit=pagination.per_page, cursor=pagination.cursor),
+    )
+    if isinstance(facilities, Response):
+        return facilities
+    if cursor := next_cursor(facilities, pagination.per_page):
+        response.headers["X-Next-Cursor"] = cursor
+    return facilities
 
 
 @router.post("")
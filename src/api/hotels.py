@@ -1,21 +1,28 @@
 from datetime import date
 
-from fastapi import Query, APIRouter, Body, HTTPException
+from fastapi import Query, APIRouter, Body, HTTPException, Request, Response
 
-from src.api.dependencies import PaginationDep, DBDep
+from src.api.dependencies import PaginationDep, DBDep, DBReadDep
 from src.database import async_session_maker
 from src.repositories.hotels import HotelsRepository
-from src.schemas.hotels import Hotel, HotelPATCH, HotelAdd
+from src.schemas.hotels import Hotel, HotelPATCH, HotelAdd, HotelAddBulk
+from src.schemas.status import BulkCreateResult, DataResponse, StatusResponse
+from src.utils.bulk_import import check_unique_keys
+from src.utils.etag import conditional_get
+from src.utils.pagination import next_cursor
+from src.utils.responses import FastJSONRoute
 
-router = APIRouter(prefix="/hotels", tags=['Отели'])
+router = APIRouter(prefix="/hotels", tags=['Отели'], route_class=FastJSONRoute)
 
 
 @router.get("",
+            response_model=list[Hotel],
             summary="Получение данных об отелях",
             description="<h1>Тут мы получаем данные об отелях</h1>", )
 async def get_hotels(
         pagination: PaginationDep,
-        db: DBDep,
+        db: DBReadDep,
+        response: Response,
         location: str | None = Query(None, description="Адрес отеля"),
         title: str | None = Query(None, description="Название отеля"),
         date_from: date = Query(example="2024-08-01"),
@@ -23,24 +30,34 @@ async def get_hotels(
 
 ):
     per_page = pagination.per_page or 5
-    return await db.hotels.get_filtered_by_time(
+    hotels = await db.hotels.get_filtered_by_time(
         date_from=date_from,
         date_to=date_to,
         location=location,
         title=title,
         limit=per_page,
-        offset=per_page * (pagination.page - 1)
+        # С курсором страница отсчитывается от него, page оставлен для старых клиентов
+        offset=0 if pagination.cursor else per_page * (pagination.page - 1),
+        cursor=pagination.cursor,
     )
+    if cursor := next_cursor(hotels, per_page, db.hotels.cursor_sort(location, title)):
+        response.headers["X-Next-Cursor"] = cursor
+    return hotels
 
 
 @router.get("/{hotel_id}",
+            response_model=Hotel | None,
             summary="Получение одного отеля",
             description="<h1>Тут мы получаем один отель</h1>", )
-async def get_hotels(hotel_id: int, db: DBDep):
-    return await db.hotels.get_one_or_none(id=hotel_id)
+async def get_hotels(hotel_id: int, db: DBReadDep, request: Request, response: Response):
+    return await conditional_get(
+        request, response, [("hotels", hotel_id)],
+        lambda: db.hotels.get_one_or_none(id=hotel_id),
+    )
 
 
 @router.post("",
+             response_model=DataResponse[Hotel],
              summary="Добавление отеля",
              description="<h1>Тут мы добовляем отель</h1>", )
 async def create_hotel(
@@ -57,11 +74,31 @@ async def create_hotel(
         })
 ):
     new_hotel = await db.hotels.add(hotel_data)
-    await db.session.commit()
+    await db.commit()
     return {"status": "OK", "data": new_hotel}
 
 
+@router.post("/bulk",
+             response_model=BulkCreateResult,
+             summary="Добавление многих отелей",
+             description="<h1>Тут мы добавляем сразу много отелей; в ответе id по ключам клиента</h1>", )
+async def create_hotels(
+        db: DBDep,
+        hotels_data: list[HotelAddBulk] = Body(openapi_examples={
+            "1": {"summary": "Два отеля", "value": [
+                {"key": "sochi", "title": "Отель Сочи 5 звезд у моря", "location": "ул. Моря, 1"},
+                {"key": "dubai", "title": "Отель Дубаи у фонтана", "location": "ул. Шейха, 2"},
+            ]},
+        }),
+):
+    check_unique_keys(hotels_data)
+    hotels = await db.hotels.add_many([HotelAdd(**item.model_dump(exclude={"key"})) for item in hotels_data])
+    await db.commit()
+    return {"status": "OK", "ids": {item.key: hotel.id for item, hotel in zip(hotels_data, hotels)}}
+
+
 @router.put("/{hotel_id}",
+            response_model=StatusResponse,
             summary="Полное обновление данных об отеле",
             description="<h1>Тут мы обновляем данные полностью</h1>", )
 async def put_change_all(
@@ -70,13 +107,14 @@ async def put_change_all(
         hotel_data: Hotel = Body(),
 ):
     await db.hotels.edit(hotel_data, id=hotel_id)
-    await db.session.commit()
+    await db.commit()
     return {"status": "OK"}
 
 
 # PATCH: Частичное обновление информации об отеле
 @router.patch(
     "/{hotel_id}",
+    response_model=StatusResponse,
     summary="Частичное обновление данных об отеле",
     description="<h1>Тут мы частично обновляем данные об отеле: можно менять один из параметров</h1>",
 )
@@ -89,15 +127,16 @@ async def patch_change_uniq(
     async with async_session_maker() as session:
         # Создаем репозиторий и передаем сессию
         await db.hotels.edit(hotel_data, exclude_unset=True, id=hotel_id)
-        await db.session.commit()
+        await db.commit()
         # Возвращаем статус OK и обновленные данные
         return {"status": "OK"}
 
 
 @router.delete("/{hotel_id}",
+               response_model=StatusResponse,
                summary="Удаление отеля",
                description="<h1>Тут мы удаляем отель</h1>", )
 async def delete_hotels(db: DBDep, hotel_id: int):
     await db.hotels.delete(id=hotel_id)
-    await db.session.commit()
+    await db.commit()
     return {"status": "ok"}
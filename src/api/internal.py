@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from src.api.dependencies import check_internal_access
+from src.database import get_pool_status
+from src.services.auth import password_hasher, token_cache
+from src.utils.cache import get_repository_cache
+from src.utils.metrics import metrics
+from src.utils.statement_cache import statement_templates
+
+# Служебные эндпоинты с метриками для эксплуатации; подключаются при INTERNAL_API_ENABLED
+router = APIRouter(prefix="/internal", tags=["Служебное"], dependencies=[Depends(check_internal_access)])
+# Метрики для Prometheus — по стандартному пути /metrics
+router_metrics = APIRouter(tags=["Служебное"], dependencies=[Depends(check_internal_access)])
+
+
+@router.get("/auth", summary="Состояние пула хеширования паролей")
+async def get_auth_pool_stats():
+    return password_hasher.stats()
+
+
+@router.get("/jwt-cache", summary="Статистика кэша расшифрованных токенов")
+async def get_jwt_cache_stats():
+    return token_cache.stats()
+
+
+@router.get("/pool", summary="Состояние пула соединений с БД")
+async def get_pool_stats():
+    return get_pool_status()
+
+
+@router.get("/cache", summary="Статистика кэша репозиториев")
+async def get_repository_cache_stats():
+    cache = get_repository_cache()
+    return {"enabled": False} if cache is None else {"enabled": True} | cache.stats()
+
+
+@router.get("/statement-cache", summary="Попадания в кэши SQL по формам запросов")
+async def get_statement_cache_stats():
+    return {"templates": len(statement_templates), "shapes": metrics.statement_cache_hit_rates()}
+
+
+@router_metrics.get("/metrics", summary="Метрики в формате Prometheus", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
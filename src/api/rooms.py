@@ -1,50 +1,110 @@
 from datetime import date
 
-from fastapi import Query, APIRouter, Body
+from fastapi import Query, APIRouter, Body, Request, Response
 
-from src.api.dependencies import DBDep
-from src.database import async_session_maker
-from src.repositories.rooms import RoomsRepository
-from src.schemas.facilities import RoomFacilityAdd
-from src.schemas.rooms import RoomAdd, RoomAddRequest, RoomPatchRequest, RoomPatch
+from src.api.dependencies import DBDep, DBReadDep
+from src.schemas.facilities import RoomsFacilitiesSetResult
+from src.schemas.rooms import Room, RoomAdd, RoomAddBulk, RoomAddRequest, RoomPatchRequest, RoomPatch, RoomWithRels
+from src.schemas.status import BulkCreateResult, DataResponse, StatusResponse
+from src.utils.bulk_import import check_unique_keys
+from src.utils.etag import ALL, conditional_get
+from src.utils.responses import FastJSONRoute
 
-router = APIRouter(prefix="/hotels", tags=["Номера"])
+router = APIRouter(prefix="/hotels", tags=["Номера"], route_class=FastJSONRoute)
 
 
 @router.get("/{hotel_id}/rooms",
+            response_model=list[RoomWithRels],
             summary="Получение данных о комнатах",
             description="<h1>Тут мы получаем данные о комнатах</h1>", )
 async def get_rooms(
-        db: DBDep,
+        db: DBReadDep,
         hotel_id: int,
         date_from: date = Query(example="2024-08-01"),
-        date_to: date = Query(example="2024-08-01")
-
+        date_to: date = Query(example="2024-08-01"),
+        required_facility_ids: list[int] = Query([], description="Удобства, которые должны быть все"),
 ):
-    return await db.rooms.get_filtered_by_time(hotel_id=hotel_id, date_from=date_from, date_to=date_to)
+    return await db.rooms.get_filtered_by_time(
+        hotel_id=hotel_id,
+        date_from=date_from,
+        date_to=date_to,
+        required_facility_ids=required_facility_ids,
+    )
 
 
 @router.get("/{hotel_id}/rooms/{room_id}",
+            response_model=RoomWithRels | None,
             summary="Получение одной комнаты",
             description="<h1>Тут мы получаем одну комнату</h1>", )
-async def get_hotels(db: DBDep, hotel_id: int, room_id: int):
-    return await db.rooms.get_one_or_none_with_rels(id=room_id, hotel_id=hotel_id)
+async def get_hotels(db: DBReadDep, hotel_id: int, room_id: int, request: Request, response: Response):
+    # В ответе номер вместе с названиями его удобств
+    return await conditional_get(
+        request, response, [("hotels", hotel_id), ("rooms", room_id), ("facilities", ALL)],
+        lambda: db.rooms.get_one_or_none_with_rels(id=room_id, hotel_id=hotel_id),
+    )
 
 
 @router.post("/{hotel_id}/rooms",
+             response_model=DataResponse[Room],
              summary="Добавление Комнаты",
              description="<h1>Тут мы добавляем комнату</h1>", )
 async def create_room(hotel_id: int, db: DBDep, room_data: RoomAddRequest = Body()):
     _room_data = RoomAdd(hotel_id=hotel_id, **room_data.model_dump())
     room = await db.rooms.add(_room_data)
 
-    rooms_facilities_data = [RoomFacilityAdd(room_id=room.id, facility_id=f_id) for f_id in room_data.facilities_ids]
-    await db.rooms_facilities.add_bulk(rooms_facilities_data)
+    await db.rooms_facilities.add_room_facilities(room.id, facilities_ids=room_data.facilities_ids)
     await db.commit()
     return {"status": "OK", "data": room}
 
 
+@router.post("/{hotel_id}/rooms/bulk",
+             response_model=BulkCreateResult,
+             summary="Добавление многих комнат",
+             description="<h1>Тут мы добавляем сразу много комнат вместе с удобствами; "
+                         "в ответе id по ключам клиента</h1>", )
+async def create_rooms(
+        hotel_id: int,
+        db: DBDep,
+        rooms_data: list[RoomAddBulk] = Body(openapi_examples={
+            "1": {"summary": "Две комнаты", "value": [
+                {"key": "std", "title": "Стандарт", "price": 5000, "quantity": 10, "facilities_ids": [1]},
+                {"key": "lux", "title": "Люкс", "price": 15000, "quantity": 2, "facilities_ids": [1, 2]},
+            ]},
+        }),
+):
+    check_unique_keys(rooms_data)
+    rooms = await db.rooms.add_many([
+        RoomAdd(hotel_id=hotel_id, **item.model_dump(exclude={"key", "facilities_ids"})) for item in rooms_data
+    ])
+    # Связи с удобствами — в той же транзакции, одним набором запросов на все комнаты
+    await db.rooms_facilities.set_rooms_facilities({
+        room.id: item.facilities_ids for item, room in zip(rooms_data, rooms) if item.facilities_ids
+    })
+    await db.commit()
+    return {"status": "OK", "ids": {item.key: room.id for item, room in zip(rooms_data, rooms)}}
+
+
+# Объявлен раньше /{hotel_id}/rooms/{room_id}, иначе "facilities" разбиралось бы как room_id
+@router.put("/{hotel_id}/rooms/facilities",
+            response_model=RoomsFacilitiesSetResult,
+            summary="Удобства многих комнат отеля разом",
+            description="<h1>Тут мы задаём полный список удобств сразу для многих комнат: "
+                        "{room_id: [facility_id, ...]}</h1>", )
+async def set_rooms_facilities(
+        hotel_id: int,
+        db: DBDep,
+        rooms_facilities: dict[int, list[int]] = Body(openapi_examples={
+            "1": {"summary": "Две комнаты", "value": {"1": [1, 2, 3], "2": []}},
+        }),
+):
+    await db.rooms.check_hotel_rooms(hotel_id, list(rooms_facilities))
+    changed_rooms_ids = await db.rooms_facilities.set_rooms_facilities(rooms_facilities)
+    await db.commit()
+    return {"status": "OK", "changed_rooms_ids": changed_rooms_ids}
+
+
 @router.put("/{hotel_id}/rooms/{room_id}",
+            response_model=StatusResponse,
             summary="Полное обновление данных о комнатах",
             description="<h1>Тут мы обновляем данные полностью</h1>", )
 async def edit_room(
@@ -64,6 +124,7 @@ async def edit_room(
 # PATCH: Частичное обновление информации об отеле
 @router.patch(
     "/{hotel_id}/rooms/{room_id}",
+    response_model=StatusResponse,
     summary="Частичное обновление данных об отеле",
     description="<h1>Тут мы частично обновляем данные об отеле: можно менять один из параметров</h1>",
 )
@@ -86,11 +147,10 @@ async def partially_edit_room(
 
 
 @router.delete("/{hotel_id}/rooms{room_id}",
+               response_model=StatusResponse,
                summary="Удаление отеля",
                description="<h1>Тут мы удаляем отель</h1>", )
-async def delete_hotels(hotel_id: int, room_id: int):
-    async with async_session_maker() as session:
-        await RoomsRepository(session).delete(id=room_id, hotel_id=hotel_id)
-        await session.commit()
-
+async def delete_hotels(hotel_id: int, room_id: int, db: DBDep):
+    await db.rooms.delete(id=room_id, hotel_id=hotel_id)
+    await db.commit()
     return {"status": "ok"}
@@ -0,0 +1,41 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Query
+
+from src.api.dependencies import DBReadDep
+from src.schemas.rooms import HotelRoomsAvailable
+from src.utils.responses import FastJSONRoute
+
+router = APIRouter(prefix="/rooms", tags=["Номера"], route_class=FastJSONRoute)
+
+
+@router.get("/search",
+            response_model=list[HotelRoomsAvailable],
+            summary="Поиск свободных номеров во всех отелях",
+            description="<h1>Свободные номера по городу, датам, цене и удобствам одним запросом, "
+                        "сгруппированные по отелям</h1>", )
+async def search_rooms(
+        db: DBReadDep,
+        date_from: date = Query(example="2024-08-01"),
+        date_to: date = Query(example="2024-08-10"),
+        location: str | None = Query(None, description="Адрес отеля"),
+        price_from: int | None = Query(None, ge=0, description="Минимальная цена"),
+        price_to: int | None = Query(None, ge=0, description="Максимальная цена"),
+        facilities_ids: list[int] = Query([], description="Удобства, которые должны быть все"),
+        guests: int = Query(1, ge=1, le=50, description="Гостей; вместимости в номерах нет, "
+                                                         "поэтому столько номеров должно быть свободно"),
+        sort: Literal["price", "-price", "hotel"] = Query("price", description="Порядок номеров"),
+        limit: int = Query(20, ge=1, le=100, description="Сколько номеров вернуть всего"),
+):
+    return await db.rooms.search_available(
+        date_from=date_from,
+        date_to=date_to,
+        location=location,
+        price_from=price_from,
+        price_to=price_to,
+        facilities_ids=facilities_ids,
+        rooms_needed=guests,
+        sort=sort,
+        limit=limit,
+    )
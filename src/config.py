@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 from pathlib import Path
 
@@ -13,9 +15,91 @@ class Settings(BaseSettings):
     def db_url(self):
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    # Пул соединений с БД
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1  # Секунды; -1 — не пересоздавать соединения по возрасту
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_WARMUP: int = 0  # Сколько соединений открыть при старте приложения
+    # Кэши SQL (src/utils/statement_cache.py): скомпилированные запросы SQLAlchemy
+    # и подготовленные statement asyncpg на каждом соединении
+    DB_QUERY_CACHE_SIZE: int = 500
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # Сколько расшифрованных токенов держать в кэше (0 — не кэшировать)
+    JWT_CACHE_SIZE: int = 10_000
+
+    # Пользователи с правами администратора (импорт бронирований и т.п.), JSON-список: [1, 2]
+    ADMIN_USER_IDS: list[int] = []
+
+    # Пул для bcrypt: хеширование не выполняется в event loop
+    AUTH_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    AUTH_HASH_WORKERS: int = 4
+    # Сколько операций может ждать свободного воркера, сверх этого — 503
+    AUTH_HASH_MAX_QUEUE: int = 64
+
+    # sql — считать свободные номера по бронированиям, inventory — по таблице room_day_inventory,
+    # memory — индексом в памяти (src/utils/availability.py). Индекс у каждого процесса свой и узнаёт
+    # только о записях своего процесса: при нескольких воркерах бронирования из соседних видны
+    # не раньше, чем индекс перестроится по AVAILABILITY_INDEX_TTL
+    AVAILABILITY_BACKEND: Literal["sql", "inventory", "memory"] = "sql"
+    AVAILABILITY_INDEX_TTL: float | None = 60  # Секунды между перестройками индекса; None — только по записям
+
+    # Фильтр "номера со всеми удобствами": mask — проверкой rooms.facilities_mask в SQL,
+    # memory — по маскам в памяти (src/utils/facilities_bitset.py). Как и индекс свободных номеров,
+    # маски у каждого процесса свои: изменения удобств из соседних воркеров видны не раньше,
+    # чем индекс перестроится по FACILITIES_INDEX_TTL
+    FACILITIES_FILTER_BACKEND: Literal["mask", "memory"] = "mask"
+    FACILITIES_INDEX_TTL: float | None = 60  # Секунды между перестройками индекса; None — только по записям
+
+    # like — подстрочный поиск отелей без ранжирования, trgm — через индексы pg_trgm
+    # с сортировкой по похожести (на других СУБД работает как like)
+    HOTEL_SEARCH_MODE: Literal["like", "trgm"] = "like"
+
+    # Кэш чтения для репозиториев с cached = True (отели, удобства): none — выключен
+    REPOSITORY_CACHE_BACKEND: Literal["none", "memory"] = "none"
+    REPOSITORY_CACHE_SIZE: int = 10_000
+    REPOSITORY_CACHE_TTL: float = 60
+
+    # Сколько строк за раз забирать из серверного курсора при потоковой выгрузке
+    STREAM_FETCH_SIZE: int = 1_000
+    # Размер пачки при импорте бронирований через COPY (POST /bookings/import)
+    IMPORT_CHUNK_SIZE: int = 10_000
+
+    # HTTP-кэширование GET отелей, номеров и удобств (src/utils/etag.py)
+    HTTP_CACHE_MAX_AGE: int = 5  # Cache-Control: max-age, секунды — сколько CDN и клиенты не перепроверяют ответ
+    ETAG_VERSIONS_SIZE: int = 100_000  # Сколько версий записей помнить
+    # Время жизни версии, секунды; None — до записи. Версии хранятся в памяти процесса,
+    # и при нескольких воркерах записи в соседних процессах сюда не доходят: столько секунд
+    # (плюс HTTP_CACHE_MAX_AGE) клиент может получать 304 на устаревшие данные.
+    # None безопасно только с одним воркером
+    ETAG_VERSION_TTL: float | None = 30
+
+    # Сжатие ответов (src/utils/compression.py): gzip, и br, если установлен brotli
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1_000  # Байты; ответы меньше отдаются как есть
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1–9
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0–11; выше 5 заметно дороже по CPU
+
+    # Каталог со скачанными и сжатыми файлами Swagger UI (src/utils/docs_assets.py);
+    # None — /docs берёт их с unpkg
+    DOCS_ASSETS_DIR: str | None = None
+    DOCS_ASSETS_MAX_AGE: int = 86_400
+
+    # Служебные эндпоинты /metrics и /internal/* (src/api/internal.py): по умолчанию не подключаются.
+    # Доступ — с заголовком Authorization: Bearer <INTERNAL_API_TOKEN> (для Prometheus) или администраторам
+    INTERNAL_API_ENABLED: bool = False
+    INTERNAL_API_TOKEN: str | None = None
+
+    # Режим диагностики SQL (src/utils/diagnostics.py): лог медленных запросов и поиск N+1
+    DIAGNOSTICS_ENABLED: bool = False
+    DIAGNOSTICS_SLOW_QUERY_MS: float = 100
+    DIAGNOSTICS_MAX_STATEMENTS: int = 20  # Больше SQL-запросов на один HTTP-запрос — предупреждение
+    DIAGNOSTICS_REPEAT_LIMIT: int = 3  # Столько запросов одной формы за HTTP-запрос — подозрение на N+1
 
     class Config:
         env_file = Path(__file__).parent.parent / ".env"
@@ -1,13 +1,99 @@
+import asyncio
+import time
+
+from sqlalchemy import event, exc, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.config import settings
+from src.utils import diagnostics
+from src.utils.metrics import after_cursor_execute, before_cursor_execute
+
+
+class PoolStats:
+    """Счётчики ожидания соединений из пула (общие для всех пересозданий пула)."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул, который замеряет, сколько запросы ждут свободное соединение."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            pool_stats.checkouts += 1
+            pool_stats.wait_seconds += waited
+            pool_stats.max_wait_seconds = max(pool_stats.max_wait_seconds, waited)
+
 
-engine = create_async_engine(settings.db_url)
+def create_engine():
+    # Соединения открываются лениво, при первом запросе или в warm_up_pool()
+    return create_async_engine(
+        settings.db_url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+    )
+
+
+engine = create_engine()
+
+# Учёт числа, времени и строк SQL-запросов для /metrics
+event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+if settings.DIAGNOSTICS_ENABLED:
+    diagnostics.install(engine)
+
+# Тот же пул, но транзакции открываются как READ ONLY (без лишнего запроса — через asyncpg)
+readonly_engine = engine.execution_options(postgresql_readonly=True)
 
 async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
 
-session = async_session_maker()
+
+async def warm_up_pool(connections: int) -> None:
+    """Заранее открывает соединения, чтобы первые запросы не платили за подключение."""
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*[ping() for _ in range(min(connections, settings.DB_POOL_SIZE))])
+
+
+def get_pool_status() -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "avg_wait_ms": pool_stats.wait_seconds / pool_stats.checkouts * 1e3 if pool_stats.checkouts else 0.0,
+        "max_wait_ms": pool_stats.max_wait_seconds * 1e3,
+    }
 
 
 class Base(DeclarativeBase):
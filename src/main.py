@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.openapi.docs import (
@@ -10,13 +12,34 @@ from pathlib import Path
 
 from src.api.hotels import router as router_hotels
 from src.api.rooms import router as router_rooms
+from src.api.search import router as router_search
 from src.api.auth import router as router_auth
 from src.api.bookings import router as router_bookings
 from src.api.facilities import router as router_facilities
+from src.api.internal import router as router_internal, router_metrics
+from src.config import settings
+from src.database import engine, warm_up_pool
+from src.services.auth import password_hasher
+from src.utils.compression import CompressionMiddleware
+from src.utils.diagnostics import DiagnosticsMiddleware
+from src.utils.docs_assets import router as router_docs_assets, asset_url
+from src.utils.metrics import MetricsMiddleware
+from src.utils.responses import FastJSONResponse
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-app = FastAPI(docs_url=None, redoc_url=None,
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_POOL_WARMUP:
+        await warm_up_pool(settings.DB_POOL_WARMUP)
+    yield
+    password_hasher.shutdown()
+    await engine.dispose()
+
+
+app = FastAPI(docs_url=None, redoc_url=None, lifespan=lifespan,
+              default_response_class=FastJSONResponse,
               title="Мое приложение",
               description="""
 ## Отели API
@@ -38,8 +61,18 @@ app = FastAPI(docs_url=None, redoc_url=None,
 app.include_router(router_auth)
 app.include_router(router_hotels)
 app.include_router(router_rooms)
+app.include_router(router_search)
 app.include_router(router_facilities)
 app.include_router(router_bookings)
+if settings.INTERNAL_API_ENABLED:
+    app.include_router(router_internal)
+    app.include_router(router_metrics)
+app.include_router(router_docs_assets)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+if settings.DIAGNOSTICS_ENABLED:
+    app.add_middleware(DiagnosticsMiddleware)
 
 
 @app.get("/docs", include_in_schema=False)
@@ -48,8 +81,8 @@ async def custom_swagger_ui_html():
         openapi_url=app.openapi_url,
         title=app.title + " - Swagger UI",
         oauth2_redirect_url=app.swagger_ui_oauth2_redirect_url,
-        swagger_js_url="https://unpkg.com/swagger-ui-dist@5/swagger-ui-bundle.js",
-        swagger_css_url="https://unpkg.com/swagger-ui-dist@5/swagger-ui.css",
+        swagger_js_url=asset_url("swagger-ui-bundle.js"),
+        swagger_css_url=asset_url("swagger-ui.css"),
     )
 
 
@@ -0,0 +1,31 @@
+"""hotels trigram indexes
+
+Revision ID: 6ecc968ca551
+Revises: 8e11fe216e9b
+Create Date: 2024-11-06 18:42:03.118950
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6ecc968ca551'
+down_revision: Union[str, None] = '8e11fe216e9b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GIN-индексы по lower(...) обслуживают фильтры lower(x) LIKE '%...%' и word_similarity
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_hotels_title_trgm', 'hotels', [sa.text('lower(title) gin_trgm_ops')],
+                    postgresql_using='gin')
+    op.create_index('ix_hotels_location_trgm', 'hotels', [sa.text('lower(location) gin_trgm_ops')],
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hotels_location_trgm', table_name='hotels')
+    op.drop_index('ix_hotels_title_trgm', table_name='hotels')
@@ -0,0 +1,40 @@
+"""room day inventory
+
+Revision ID: 8e11fe216e9b
+Revises: d40ac7d6d739
+Create Date: 2024-11-04 12:10:41.502113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8e11fe216e9b'
+down_revision: Union[str, None] = 'd40ac7d6d739'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('room_day_inventory',
+                    sa.Column('room_id', sa.Integer(), nullable=False),
+                    sa.Column('day', sa.Date(), nullable=False),
+                    sa.Column('rooms_left', sa.Integer(), nullable=False),
+                    sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+                    sa.PrimaryKeyConstraint('room_id', 'day')
+                    )
+    # Заполняем остатки по уже существующим бронированиям
+    op.execute("""
+        INSERT INTO room_day_inventory (room_id, day, rooms_left)
+        SELECT r.id, d.day::date, r.quantity - count(*)
+        FROM bookings b
+        JOIN rooms r ON r.id = b.room_id
+        CROSS JOIN LATERAL generate_series(b.date_from, b.date_to, interval '1 day') AS d(day)
+        GROUP BY r.id, r.quantity, d.day
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('room_day_inventory')
@@ -0,0 +1,34 @@
+"""rooms_facilities unique room_id, facility_id
+
+Revision ID: adda26df458f
+Revises: c52aa72835a1
+Create Date: 2024-11-14 15:02:33.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'adda26df458f'
+down_revision: Union[str, None] = 'c52aa72835a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Повторные связи могли остаться от add_bulk без проверки — оставляем первую
+    op.execute("""
+        DELETE FROM rooms_facilities a
+        USING rooms_facilities b
+        WHERE a.room_id = b.room_id AND a.facility_id = b.facility_id AND a.id > b.id
+    """)
+    op.create_unique_constraint('uq_rooms_facilities_room_id_facility_id', 'rooms_facilities',
+                                ['room_id', 'facility_id'])
+    # Индекс ограничения покрывает те же столбцы
+    op.drop_index('ix_rooms_facilities_room_id_facility_id', table_name='rooms_facilities')
+
+
+def downgrade() -> None:
+    op.create_index('ix_rooms_facilities_room_id_facility_id', 'rooms_facilities', ['room_id', 'facility_id'])
+    op.drop_constraint('uq_rooms_facilities_room_id_facility_id', 'rooms_facilities', type_='unique')
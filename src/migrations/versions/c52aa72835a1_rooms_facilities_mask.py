@@ -0,0 +1,36 @@
+"""rooms facilities mask
+
+Revision ID: c52aa72835a1
+Revises: 09289f1d7dce
+Create Date: 2024-11-12 10:41:07.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52aa72835a1'
+down_revision: Union[str, None] = '09289f1d7dce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('rooms', sa.Column('facilities_mask', sa.BigInteger(), server_default='0', nullable=False))
+    # Маски для уже существующих связей: бит facility_id - 1, как в src/utils/facilities_bitset.py
+    op.execute("""
+        UPDATE rooms SET facilities_mask = masks.mask
+        FROM (
+            SELECT room_id, bit_or(1::bigint << (facility_id - 1)) AS mask
+            FROM rooms_facilities
+            WHERE facility_id BETWEEN 1 AND 63
+            GROUP BY room_id
+        ) AS masks
+        WHERE rooms.id = masks.room_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('rooms', 'facilities_mask')
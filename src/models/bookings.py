@@ -7,7 +7,7 @@ from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column
 
 # Импорт ForeignKey для связи между таблицами (внешний ключ).
-from sqlalchemy import ForeignKey
+from sqlalchemy import CheckConstraint, ForeignKey, Index, func, literal_column
 
 # Импорт базового класса модели, от которого наследуются все таблицы.
 from src.database import Base
@@ -15,6 +15,12 @@ from src.database import Base
 
 class BookingOrm(Base):  # Определение класса модели для таблицы "bookings".
     __tablename__ = "bookings"  # Имя таблицы в базе данных.
+    __table_args__ = (
+        # Бронирования комнаты за период и бронирования пользователя (в порядке keyset-пагинации)
+        Index("ix_bookings_room_id_date_from_date_to", "room_id", "date_from", "date_to"),
+        Index("ix_bookings_user_id", "user_id", "id"),
+        CheckConstraint("date_to >= date_from", name="ck_bookings_date_to_ge_date_from"),
+    )
 
     # Уникальный идентификатор записи (первичный ключ).
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -38,3 +44,11 @@ class BookingOrm(Base):  # Определение класса модели дл
     def total_cost(self) -> int:
         # Вычисляет общую стоимость бронирования как произведение цены на количество дней.
         return self.price * (self.date_to - self.date_from).days
+
+
+# Период бронирования с обеими границами включительно. Выражение должно совпадать с индексом
+# ix_bookings_daterange буква в букву (в том числе '[]' литералом, а не параметром),
+# иначе планировщик не сможет использовать индекс для оператора &&.
+booked_period = func.daterange(BookingOrm.date_from, BookingOrm.date_to, literal_column("'[]'"))
+
+Index("ix_bookings_daterange", booked_period, postgresql_using="gist")
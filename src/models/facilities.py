@@ -1,6 +1,6 @@
 from src.database import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, UniqueConstraint
 
 
 class FacilitiesOrm(Base):
@@ -17,6 +17,10 @@ class FacilitiesOrm(Base):
 
 class RoomsFacilitiesOrm(Base):
     __tablename__ = "rooms_facilities"
+    __table_args__ = (
+        # Заодно индекс для выборки удобств комнаты и цель ON CONFLICT в set_rooms_facilities
+        UniqueConstraint("room_id", "facility_id", name="uq_rooms_facilities_room_id_facility_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id"))
@@ -0,0 +1,15 @@
+from datetime import date
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class RoomDayInventoryOrm(Base):
+    """Сколько номеров данного типа осталось свободно на конкретный день."""
+    __tablename__ = "room_day_inventory"
+
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(primary_key=True)
+    rooms_left: Mapped[int]
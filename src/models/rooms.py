@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey
+from sqlalchemy import BigInteger, ForeignKey
 
 from src.database import Base
 
@@ -8,11 +8,13 @@ class RoomsORM(Base):
     __tablename__ = "rooms"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id"))
+    hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id"), index=True)
     title: Mapped[str] = mapped_column()
     description: Mapped[str | None]
     price: Mapped[int] = mapped_column()
     quantity: Mapped[int] = mapped_column()
+    # Набор удобств битами (src/utils/facilities_bitset.py), копия rooms_facilities для быстрых фильтров
+    facilities_mask: Mapped[int] = mapped_column(BigInteger, server_default="0")
 
     facilities: Mapped[list["FacilitiesOrm"]] = relationship(
         back_populates="rooms",
@@ -1,68 +1,205 @@
+import inspect
+
 from fastapi import HTTPException
 from pydantic import BaseModel
 from sqlalchemy import select, insert, update, delete
 
 from src.repositories.mappers.base import DataMapper
+from src.utils.cache import MISSING, get_repository_cache
+from src.utils.etag import entity_versions
+from src.utils.metrics import timed_call
+from src.utils.pagination import decode_cursor
+
+
+# Postgres принимает не больше 32767 параметров в одном запросе
+MAX_BIND_PARAMS = 32767
 
 
 class BaseRepository:
     model = None
     mapper: DataMapper = None
+    # Читать get_one_or_none и get_all через кэш репозиториев (src/utils/cache.py)
+    cached: bool = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Публичные корутины репозитория (в том числе унаследованные) становятся
+        # спанами "HotelsRepository.get_filtered_by_time" в /metrics
+        for name in dir(cls):
+            func = getattr(cls, name)
+            if name.startswith("_") or not inspect.iscoroutinefunction(func):
+                continue
+            setattr(cls, name, timed_call(f"{cls.__name__}.{name}", getattr(func, "__wrapped__", func)))
 
     def __init__(self, session):
         self.session = session
 
-    async def get_filtered(self, *filter, **filter_by):
+    def _on_commit(self, callback) -> None:
+        """Откладывает вызов callback до успешного DBManager.commit()."""
+        self.session.info.setdefault("on_commit", []).append(callback)
+
+    def _invalidate_cache(self, ids: list | None = None) -> None:
+        """После коммита сбрасывает кэш таблицы и версии ETag записей ids (None — всех)."""
+        namespace = self.model.__tablename__
+        cache = get_repository_cache()
+        if cache is not None:
+            self._on_commit(lambda: cache.invalidate(namespace))
+        self._on_commit(lambda: entity_versions.forget(namespace, ids))
+
+    async def _read_through(self, key, load):
+        cache = get_repository_cache() if self.cached else None
+        # После записи в этой же транзакции читаем мимо кэша: данные ещё не зафиксированы
+        if cache is None or self.session.info.get("on_commit"):
+            return await load()
+        namespace = self.model.__tablename__
+        value = await cache.get(namespace, key)
+        if value is MISSING:
+            value = await load()
+            await cache.set(namespace, key, value)
+        return value
+
+    async def get_filtered(self, *filter, limit: int | None = None, cursor: str | None = None, **filter_by):
         query = (
-            select(self.model)
+            select(*self.mapper.columns())
             .filter(*filter)
             .filter_by(**filter_by)
         )
+        if limit is not None or cursor is not None:
+            # Keyset-пагинация по id: следующая страница начинается после последнего id из курсора
+            query = query.order_by(self.model.id).limit(limit)
+            if cursor is not None:
+                query = query.filter(self.model.id > decode_cursor(cursor))
         result = await self.session.execute(query)
-        return [self.mapper.map_to_domain_entity(model) for model in result.scalars().all()]
+        return self.mapper.map_rows_to_domain_entities(result.all())
+
+    async def stream_filtered(self, *filter, fetch_size: int, cursor: str | None = None, **filter_by):
+        """
+        Отдаёт пачки схем по мере чтения из серверного курсора, не загружая таблицу целиком.
+        Порядок — по id, поэтому прерванную выгрузку можно продолжить с курсора.
+        """
+        query = (
+            select(*self.mapper.columns())
+            .filter(*filter)
+            .filter_by(**filter_by)
+            .order_by(self.model.id)
+            .execution_options(yield_per=fetch_size)
+        )
+        if cursor is not None:
+            query = query.filter(self.model.id > decode_cursor(cursor))
+        result = await self.session.stream(query)
+        async for rows in result.partitions():
+            yield self.mapper.map_rows_to_domain_entities(rows)
 
-    async def get_all(self, *args, **kwargs):
-        return await self.get_filtered()
+    async def get_all(self, limit: int | None = None, cursor: str | None = None):
+        return await self._read_through(
+            ("all", limit, cursor),
+            lambda: self.get_filtered(limit=limit, cursor=cursor),
+        )
 
     async def get_one_or_none(self, **filter_by):
-        query = select(self.model).filter_by(**filter_by)
+        return await self._read_through(
+            ("one", tuple(sorted(filter_by.items()))),
+            lambda: self._get_one_or_none(**filter_by),
+        )
+
+    async def _get_one_or_none(self, **filter_by):
+        query = select(*self.mapper.columns()).filter_by(**filter_by)
         result = await self.session.execute(query)
-        model = result.scalars().one_or_none()
-        if model is None:
+        row = result.one_or_none()
+        if row is None:
             return None
-        return self.mapper.map_to_domain_entity(model)
+        return self.mapper.map_rows_to_domain_entities([row])[0]
 
     async def add(self, data: BaseModel):
         add_data_stmt = insert(self.model).values(**data.model_dump()).returning(self.model)
         result = await self.session.execute(add_data_stmt)
         model = result.scalars().one()
+        self._invalidate_cache([model.id])
         return self.mapper.map_to_domain_entity(model)
 
+    async def add_many(self, data: list[BaseModel]) -> list:
+        """
+        Вставляет записи многострочными INSERT ... RETURNING и возвращает их в порядке data.
+        В отличие от add_bulk, возвращает созданное (с id), в отличие от add — не по одной.
+        """
+        values = [item.model_dump() for item in data]
+        if not values:
+            return []
+        entities = []
+        chunk_size = max(1, MAX_BIND_PARAMS // len(values[0]))
+        # sort_by_parameter_order — строки RETURNING в том же порядке, что и values
+        add_data_stmt = insert(self.model).returning(*self.mapper.columns(), sort_by_parameter_order=True)
+        for start in range(0, len(values), chunk_size):
+            rows = (await self.session.execute(add_data_stmt, values[start:start + chunk_size])).all()
+            entities += self.mapper.map_rows_to_domain_entities(rows)
+        self._invalidate_cache([entity.id for entity in entities])
+        return entities
+
     async def add_bulk(self, data: list[BaseModel]):
-        add_data_stmt = insert(self.model).values([item.model_dump() for item in data])
-        await self.session.execute(add_data_stmt)
+        values = [item.model_dump() for item in data]
+        if not values:
+            return
+        # Режем на пачки так, чтобы параметров в одном INSERT было не больше MAX_BIND_PARAMS
+        chunk_size = max(1, MAX_BIND_PARAMS // len(values[0]))
+        for start in range(0, len(values), chunk_size):
+            add_data_stmt = insert(self.model).values(values[start:start + chunk_size])
+            await self.session.execute(add_data_stmt)
+        self._invalidate_cache()
 
-    async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by) -> None:
+    async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by) -> list:
+        """Обновляет записи одним UPDATE ... RETURNING и возвращает их новое состояние."""
         update_stmt = (
             update(self.model)
             .filter_by(**filter_by)
             .values(**data.model_dump(exclude_unset=exclude_unset))  # Передаем данные для обновления
+            .returning(*self.mapper.columns())
         )
-        result = await self.session.execute(update_stmt)
-
-        if result.rowcount == 0:
+        rows = (await self.session.execute(update_stmt)).all()
+        if not rows:
             raise HTTPException(status_code=402, detail="Такого ID нет.")
+        entities = self.mapper.map_rows_to_domain_entities(rows)
+        self._invalidate_cache([entity.id for entity in entities])
+        return entities
 
-        await self.session.execute(update_stmt)
+    async def edit_many(self, data: BaseModel, ids: list[int], exclude_unset: bool = False) -> list:
+        """Применяет одни и те же изменения к нескольким записям одним запросом."""
+        update_stmt = (
+            update(self.model)
+            .filter(self.model.id.in_(ids))
+            .values(**data.model_dump(exclude_unset=exclude_unset))
+            .returning(*self.mapper.columns())
+        )
+        rows = (await self.session.execute(update_stmt)).all()
+        self._check_all_found(ids, rows)
+        entities = self.mapper.map_rows_to_domain_entities(rows)
+        self._invalidate_cache([entity.id for entity in entities])
+        return entities
 
-    async def delete(self, **filter_by):
-        delete_stmt = delete(self.model).filter_by(**filter_by)
-        query = select(self.model).filter_by(**filter_by)
-        result = await self.session.execute(query)
-        hotel = result.scalars().one_or_none()
+    async def delete(self, **filter_by) -> list:
+        """Удаляет записи одним DELETE ... RETURNING и возвращает удалённое."""
+        delete_stmt = delete(self.model).filter_by(**filter_by).returning(*self.mapper.columns())
+        rows = (await self.session.execute(delete_stmt)).all()
 
         # Если объект не найден, выбрасываем исключение 404
-        if hotel is None:
+        if not rows:
             raise HTTPException(status_code=404, detail="Hotel not found")
-        await self.session.execute(delete_stmt)
-        return delete_stmt
+        entities = self.mapper.map_rows_to_domain_entities(rows)
+        self._invalidate_cache([entity.id for entity in entities])
+        return entities
+
+    async def delete_many(self, ids: list[int]) -> list:
+        delete_stmt = delete(self.model).filter(self.model.id.in_(ids)).returning(*self.mapper.columns())
+        rows = (await self.session.execute(delete_stmt)).all()
+        self._check_all_found(ids, rows)
+        entities = self.mapper.map_rows_to_domain_entities(rows)
+        self._invalidate_cache([entity.id for entity in entities])
+        return entities
+
+    def _check_all_found(self, ids: list[int], rows, id_index: int | None = None) -> None:
+        # Частичное изменение откатится вместе с транзакцией.
+        # id_index — позиция id в строке; по умолчанию строки — столбцы mapper.columns()
+        if id_index is None:
+            id_index = list(self.mapper.schema.model_fields).index("id")
+        missing_ids = set(ids) - {row[id_index] for row in rows}
+        if missing_ids:
+            raise HTTPException(status_code=404, detail=f"Не найдены ID: {sorted(missing_ids)}")
@@ -1,9 +1,133 @@
+import time
+from datetime import date, timedelta
+
+from asyncpg.exceptions import ForeignKeyViolationError
+from fastapi import HTTPException
+from sqlalchemy import select, update, delete, func, any_, literal, Date, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+
 from src.models.bookings import BookingOrm
+from src.models.room_inventory import RoomDayInventoryOrm
+from src.models.rooms import RoomsORM
 from src.repositories.base import BaseRepository
 from src.repositories.mappers.mappers import BookingDataMapper
-from src.schemas.bookings import Booking
+from src.schemas.bookings import Booking, BookingAdd
+from src.utils.availability import availability_index
 
 
 class BookingsRepository(BaseRepository):
     model = BookingOrm
     mapper = BookingDataMapper
+
+    async def add(self, data: BookingAdd) -> Booking:
+        await self.reserve_rooms(data.room_id, data.date_from, data.date_to)
+        booking = await super().add(data)
+        self._on_commit(
+            lambda: availability_index.add_booking(booking.room_id, booking.date_from, booking.date_to)
+        )
+        return booking
+
+    async def reserve_rooms(self, room_id: int, date_from: date, date_to: date) -> None:
+        """
+        Списывает по одному номеру на каждый день интервала в room_day_inventory.
+
+        Списание делается одним условным UPDATE, поэтому конкурентные бронирования
+        одной комнаты выстраиваются в очередь на блокировках строк, а не продают
+        лишний номер. Если хотя бы на один день номеров не осталось — 409,
+        частичное списание откатывается вместе с транзакцией.
+        """
+        days_count = (date_to - date_from).days + 1
+        if days_count <= 0:
+            raise HTTPException(status_code=400, detail="Дата выезда раньше даты заезда")
+
+        # Дни, на которые ещё никто не бронировал, заводим с полным количеством номеров
+        days = func.generate_series(date_from, date_to, timedelta(days=1)).cast(Date)
+        seed_stmt = (
+            insert(RoomDayInventoryOrm)
+            .from_select(
+                ["room_id", "day", "rooms_left"],
+                select(RoomsORM.id, days, RoomsORM.quantity).filter(RoomsORM.id == room_id),
+            )
+            .on_conflict_do_nothing(index_elements=["room_id", "day"])
+        )
+        await self.session.execute(seed_stmt)
+
+        reserve_stmt = (
+            update(RoomDayInventoryOrm)
+            .filter(
+                RoomDayInventoryOrm.room_id == room_id,
+                RoomDayInventoryOrm.day.between(date_from, date_to),
+                RoomDayInventoryOrm.rooms_left > 0,
+            )
+            .values(rooms_left=RoomDayInventoryOrm.rooms_left - 1)
+            .returning(RoomDayInventoryOrm.day)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(reserve_stmt)
+        if len(result.all()) != days_count:
+            raise HTTPException(status_code=409, detail="Нет свободных номеров на выбранные даты")
+
+    async def import_bulk(self, batches) -> list[dict]:
+        """
+        Заливает пачки BookingAdd через COPY (asyncpg copy_records_to_table) в текущей
+        транзакции и возвращает статистику по каждой пачке. Бронирование неизвестной
+        комнаты или пользователя — 422 с номером пачки, транзакция при этом откатывается.
+
+        Вместимость комнат не проверяется: импортируются уже состоявшиеся бронирования.
+        Остатки в room_day_inventory для затронутых комнат пересчитываются целиком.
+        """
+        columns = list(BookingAdd.model_fields)
+        # Адаптер asyncpg открывает транзакцию лениво, на первом запросе через сессию.
+        # COPY идёт мимо него, поэтому сначала выполняем запрос сами — иначе каждая пачка
+        # фиксировалась бы отдельно и не откатывалась при ошибке в следующих
+        await self.session.execute(select(1))
+        connection = await self.session.connection()
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+        rooms_ids = set()
+        chunks = []
+        async for batch in batches:
+            start = time.perf_counter()
+            try:
+                await driver_connection.copy_records_to_table(
+                    self.model.__tablename__,
+                    records=[tuple(getattr(booking, column) for column in columns) for booking in batch],
+                    columns=columns,
+                )
+            except ForeignKeyViolationError as e:
+                # Неизвестный room_id или user_id; номер строки в detail asyncpg не сообщает
+                raise HTTPException(status_code=422, detail=[
+                    {"batch": len(chunks) + 1, "loc": [], "msg": e.detail or str(e)},
+                ])
+            elapsed = time.perf_counter() - start
+            rooms_ids.update(booking.room_id for booking in batch)
+            chunks.append({
+                "rows": len(batch),
+                "seconds": elapsed,
+                "rows_per_second": len(batch) / elapsed if elapsed else None,
+            })
+        if rooms_ids:
+            await self.rebuild_inventory(list(rooms_ids))
+            self._on_commit(availability_index.invalidate)
+        return chunks
+
+    async def rebuild_inventory(self, rooms_ids: list[int]) -> None:
+        """Пересчитывает room_day_inventory указанных комнат по таблице bookings."""
+        # Один параметр-массив вместо IN (...): комнат может быть больше лимита параметров
+        rooms_ids = any_(literal(rooms_ids, ARRAY(Integer)))
+        await self.session.execute(
+            delete(RoomDayInventoryOrm).filter(RoomDayInventoryOrm.room_id == rooms_ids)
+        )
+        days = func.generate_series(BookingOrm.date_from, BookingOrm.date_to, timedelta(days=1))
+        booked_days = (
+            select(BookingOrm.room_id, days.cast(Date).label("day"))
+            .filter(BookingOrm.room_id == rooms_ids)
+            .subquery()
+        )
+        rooms_left = (
+            select(booked_days.c.room_id, booked_days.c.day, RoomsORM.quantity - func.count())
+            .join(RoomsORM, RoomsORM.id == booked_days.c.room_id)
+            .group_by(booked_days.c.room_id, booked_days.c.day, RoomsORM.quantity)
+        )
+        await self.session.execute(
+            insert(RoomDayInventoryOrm).from_select(["room_id", "day", "rooms_left"], rooms_left)
+        )
@@ -1,8 +1,12 @@
-from sqlalchemy import select, delete, insert
+from sqlalchemy import select, delete, update, exists, func, any_, literal, BigInteger, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from src.models.facilities import FacilitiesOrm, RoomsFacilitiesOrm
+from src.models.rooms import RoomsORM
 from src.repositories.base import BaseRepository
 from src.repositories.mappers.mappers import FacilityDataMapper
-from src.schemas.facilities import Facility, RoomsFacility
+from src.schemas.facilities import Facility, RoomFacilityAdd, RoomsFacility
+from src.utils.etag import entity_versions
+from src.utils.facilities_bitset import facilities_index, facilities_mask
 
 
 # Репозиторий для работы с таблицей "facilities" (удобства)
@@ -16,6 +20,7 @@ class FacilitiesRepository(BaseRepository):
     """
     model = FacilitiesOrm
     mapper = FacilityDataMapper
+    cached = True
 
 
 # Репозиторий для работы с таблицей связей "rooms_facilities"
@@ -30,6 +35,19 @@ class RoomsFacilitiesRepository(BaseRepository):
     model = RoomsFacilitiesOrm
     schema = RoomsFacility
 
+    async def _set_facilities_mask(self, room_id: int, facilities_ids: list[int]) -> None:
+        """Пересчитывает rooms.facilities_mask по новому набору удобств комнаты."""
+        mask = facilities_mask(facilities_ids)
+        await self.session.execute(update(RoomsORM).filter_by(id=room_id).values(facilities_mask=mask))
+        self._on_commit(lambda: facilities_index.set_mask(room_id, mask))
+
+    async def add_room_facilities(self, room_id: int, facilities_ids: list[int]) -> None:
+        """Связывает только что созданную комнату с удобствами."""
+        if not facilities_ids:
+            return
+        await self.add_bulk([RoomFacilityAdd(room_id=room_id, facility_id=f_id) for f_id in facilities_ids])
+        await self._set_facilities_mask(room_id, facilities_ids)
+
     async def set_room_facilities(self, room_id: int, facilities_ids: list[int]) -> None:
         """
         Устанавливает список удобств для указанной комнаты.
@@ -42,33 +60,79 @@ class RoomsFacilitiesRepository(BaseRepository):
         Returns:
             None
         """
-        # Получаем текущий список ID удобств, связанных с данной комнатой
-        get_current_facilities_ids_query = (
-            select(self.model.facility_id)
-            .filter_by(room_id=room_id)
+        await self.set_rooms_facilities({room_id: facilities_ids})
+
+    async def set_rooms_facilities(self, rooms_facilities: dict[int, list[int]]) -> list[int]:
+        """
+        То же, что set_room_facilities, сразу для многих комнат: {room_id: [facility_id, ...]}.
+
+        Число запросов не зависит от числа комнат: пары передаются массивами в unnest,
+        лишние связи удаляются одним DELETE, недостающие добавляются одним
+        INSERT ... ON CONFLICT DO NOTHING, маски изменившихся комнат — одним UPDATE.
+        Возвращает ID комнат, у которых набор удобств изменился.
+        """
+        if not rooms_facilities:
+            return []
+        rooms_ids = list(rooms_facilities)
+        pairs = [(room_id, f_id) for room_id, f_ids in rooms_facilities.items() for f_id in set(f_ids)]
+        desired = (
+            func.unnest(
+                literal([room_id for room_id, _ in pairs], ARRAY(Integer)),
+                literal([f_id for _, f_id in pairs], ARRAY(Integer)),
+            )
+            .table_valued("room_id", "facility_id")
+            .render_derived(name="desired")
         )
-        result = await self.session.execute(get_current_facilities_ids_query)
-        current_facilities_ids: list[int] = result.scalars().all()
-
-        # Определяем, какие связи нужно удалить, а какие добавить
-        ids_to_delete: list[int] = list(set(current_facilities_ids) - set(facilities_ids))
-        ids_to_insert: list[int] = list(set(facilities_ids) - set(current_facilities_ids))
-
-        # Удаляем устаревшие связи
-        if ids_to_delete:
-            delete_m2m_facilities_stmt = (
-                delete(self.model)
-                .filter(
-                    self.model.room_id == room_id,
-                    self.model.facility_id.in_(ids_to_delete),
-                )
+
+        # Удаляем связи комнат из списка, которых нет среди нужных пар
+        delete_stmt = (
+            delete(self.model)
+            .filter(
+                self.model.room_id == any_(literal(rooms_ids, ARRAY(Integer))),
+                ~exists().where(
+                    desired.c.room_id == self.model.room_id,
+                    desired.c.facility_id == self.model.facility_id,
+                ),
             )
-            await self.session.execute(delete_m2m_facilities_stmt)
+            .returning(self.model.room_id)
+        )
+        changed = set((await self.session.execute(delete_stmt)).scalars().all())
 
-        # Добавляем новые связи
-        if ids_to_insert:
-            insert_m2m_facilities_stmt = (
+        # Добавляем недостающие; уже существующие пары отсекает uq_rooms_facilities_room_id_facility_id
+        if pairs:
+            insert_stmt = (
                 insert(self.model)
-                .values([{"room_id": room_id, "facility_id": f_id} for f_id in ids_to_insert])
+                .from_select(["room_id", "facility_id"], select(desired.c.room_id, desired.c.facility_id))
+                .on_conflict_do_nothing(index_elements=["room_id", "facility_id"])
+                .returning(self.model.room_id)
+            )
+            changed |= set((await self.session.execute(insert_stmt)).scalars().all())
+        if not changed:
+            return []
+
+        changed_ids = sorted(changed)
+        masks = {room_id: facilities_mask(rooms_facilities[room_id]) for room_id in changed_ids}
+        new_masks = (
+            func.unnest(
+                literal(changed_ids, ARRAY(Integer)),
+                literal([masks[room_id] for room_id in changed_ids], ARRAY(BigInteger)),
             )
-            await self.session.execute(insert_m2m_facilities_stmt)
+            .table_valued("room_id", "mask")
+            .render_derived(name="new_masks")
+        )
+        await self.session.execute(
+            update(RoomsORM)
+            .filter(RoomsORM.id == new_masks.c.room_id)
+            .values(facilities_mask=new_masks.c.mask)
+        )
+
+        self._invalidate_cache()
+
+        def on_commit():
+            for room_id, mask in masks.items():
+                facilities_index.set_mask(room_id, mask)
+            # Удобства входят в ответ GET номера — сбрасываем и его ETag
+            entity_versions.forget(RoomsORM.__tablename__, changed_ids)
+
+        self._on_commit(on_commit)
+        return changed_ids
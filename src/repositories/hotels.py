@@ -1,18 +1,71 @@
 from datetime import date
 
-from sqlalchemy import select, func
+from sqlalchemy import select, or_, and_, bindparam, Integer
+from sqlalchemy.orm import aliased
 
+from src.config import settings
 from src.models.hotels import HotelsORM
-from src.models.rooms import RoomsORM
 from src.repositories.base import BaseRepository
 from src.repositories.mappers.mappers import HotelDataMapper
-from src.repositories.utils import rooms_ids_for_booking
+from src.repositories.utils import availability_params, free_hotels_condition, text_search, text_search_params
 from src.schemas.hotels import Hotel
+from src.utils.pagination import decode_cursor
+from src.utils.statement_cache import statement_templates
 
 
 class HotelsRepository(BaseRepository):
     model = HotelsORM
     mapper = HotelDataMapper
+    cached = True
+
+    def cursor_sort(self, location: str | None, title: str | None) -> str:
+        """Ключ сортировки выдачи: rank при ранжированном поиске, иначе id."""
+        ranked = settings.HOTEL_SEARCH_MODE == "trgm" and self.session.bind.dialect.name == "postgresql"
+        return "rank" if ranked and (location or title) else "id"
+
+    @staticmethod
+    def _search_rank(hotel, location: bool, title: bool):
+        total_rank = None
+        for column, name, active in ((hotel.location, "location", location), (hotel.title, "title", title)):
+            if active:
+                _, rank = text_search(column, name, ranked=True)
+                total_rank = rank if total_rank is None else total_rank + rank
+        return total_rank
+
+    def _filtered_by_time_query(self, location: bool, title: bool, sort: str, after_cursor: bool):
+        """Шаблон запроса get_filtered_by_time: location и title — включены ли эти фильтры."""
+        query = select(*self.mapper.columns()).filter(free_hotels_condition())
+        for column, name, active in ((HotelsORM.location, "location", location), (HotelsORM.title, "title", title)):
+            if active:
+                condition, _ = text_search(column, name)
+                query = query.filter(condition)
+
+        if sort == "rank":
+            # Сначала лучшие совпадения, при равенстве — по id, чтобы страницы были стабильными
+            rank = self._search_rank(HotelsORM, location, title)
+            query = query.order_by(rank.desc(), HotelsORM.id)
+        else:
+            query = query.order_by(HotelsORM.id)
+
+        if after_cursor:
+            last_id = bindparam("last_id", type_=Integer)
+            if sort == "rank":
+                # Ранг последней записи пересчитываем по её id, поэтому в курсоре хватает одного id
+                last_hotel = aliased(HotelsORM)
+                last_rank = (
+                    select(self._search_rank(last_hotel, location, title))
+                    .filter(last_hotel.id == last_id)
+                    .scalar_subquery()
+                )
+                query = query.filter(or_(rank < last_rank, and_(rank == last_rank, HotelsORM.id > last_id)))
+            else:
+                query = query.filter(HotelsORM.id > last_id)
+
+        return (
+            query
+            .limit(bindparam("limit", type_=Integer))
+            .offset(bindparam("offset", type_=Integer))
+        )
 
     async def get_filtered_by_time(
             self,
@@ -21,25 +74,25 @@ class HotelsRepository(BaseRepository):
             location,
             title,
             limit,
-            offset,
+            offset=0,
+            cursor: str | None = None,
     ) -> list[Hotel]:
-        rooms_ids_to_get = rooms_ids_for_booking(date_from=date_from, date_to=date_to)
-        hotels_ids_to_get = (
-            select(RoomsORM.hotel_id)
-            .select_from(RoomsORM)
-            .filter(RoomsORM.id.in_(rooms_ids_to_get))
-        )
-        query = select(HotelsORM).filter(HotelsORM.id.in_(hotels_ids_to_get))
-        if location:
-            query = query.filter(func.lower(HotelsORM.location).contains(func.lower(location.strip())))
-        if title:
-            query = query.filter(func.lower(HotelsORM.title).contains(func.lower(title.strip())))
+        sort = self.cursor_sort(location, title)
+        params = await availability_params(self.session, date_from, date_to, hotels=True)
+        params |= {"limit": limit, "offset": offset}
+        for name, value in (("location", location), ("title", title)):
+            if value:
+                params |= text_search_params(name, value)
+        if cursor is not None:
+            params["last_id"] = decode_cursor(cursor, sort)
 
-        query = (
-            query
-            .limit(limit)
-            .offset(offset)
+        shape = (
+            "hotels.get_filtered_by_time", settings.AVAILABILITY_BACKEND,
+            bool(location), bool(title), sort, cursor is not None,
+        )
+        query = statement_templates.get(
+            shape, lambda: self._filtered_by_time_query(bool(location), bool(title), sort, cursor is not None),
         )
-        result = await self.session.execute(query)
+        result = await self.session.execute(query, params)
 
-        return [self.mapper.map_to_domain_entity(hotel) for hotel in result.scalars().all()]
+        return self.mapper.map_rows_to_domain_entities(result.all())
@@ -1,6 +1,6 @@
 from typing import TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from src.database import Base
 
@@ -19,3 +19,29 @@ class DataMapper:
     @classmethod
     def map_to_persistence_entity(cls, data):
         return cls.db_model(**data.model_dump())
+
+    @classmethod
+    def columns(cls) -> list:
+        """Столбцы db_model в порядке полей схемы — чтобы выбирать только нужное, без ORM-объектов."""
+        return [getattr(cls.db_model, name) for name in cls.schema.model_fields]
+
+    @classmethod
+    def list_adapter(cls) -> TypeAdapter:
+        # Отдельный адаптер на каждый класс маппера, собирается один раз
+        if "_list_adapter" not in cls.__dict__:
+            cls._list_adapter = TypeAdapter(list[cls.schema])
+        return cls._list_adapter
+
+    @classmethod
+    def map_to_domain_entities(cls, models) -> list:
+        """Пакетная версия map_to_domain_entity для ORM-объектов."""
+        return cls.list_adapter().validate_python(models, from_attributes=True)
+
+    @classmethod
+    def map_rows_to_domain_entities(cls, rows) -> list:
+        """
+        Строки запроса select(*cls.columns()) в схемы одной пакетной валидацией.
+        Это быстрее, чем model_validate на каждую строку и даже чем model_construct.
+        """
+        names = list(cls.schema.model_fields)
+        return cls.list_adapter().validate_python([dict(zip(names, row)) for row in rows])
@@ -1,12 +1,31 @@
 from datetime import date
 
-from sqlalchemy import select
+from sqlalchemy import select, update, bindparam, any_, literal, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import joinedload, selectinload
 
+from src.config import settings
+from src.models.hotels import HotelsORM
+from src.models.room_inventory import RoomDayInventoryOrm
 from src.models.rooms import RoomsORM  # Модель, представляющая таблицу с комнатами (rooms)
 from src.repositories.base import BaseRepository  # Базовый репозиторий, обеспечивающий базовые операции с БД
 from src.repositories.mappers.mappers import RoomDataMapper, RoomDataWithRelsMapper
-from src.repositories.utils import rooms_ids_for_booking
+from src.repositories.utils import (
+    availability_params,
+    check_period,
+    facilities_filter_kind,
+    facilities_params,
+    free_rooms_condition,
+    rooms_left_for_period,
+    rooms_with_facilities,
+    text_search,
+    text_search_params,
+)
+from src.schemas.hotels import Hotel
+from src.schemas.rooms import HotelRoomsAvailable, RoomAvailable
+from src.utils.availability import availability_index
+from src.utils.facilities_bitset import facilities_index
+from src.utils.statement_cache import statement_templates
 
 
 # Репозиторий для работы с комнатами (rooms)
@@ -21,17 +40,128 @@ class RoomsRepository(BaseRepository):
             hotel_id,  # ID отеля, для которого ищем комнаты
             date_from: date,  # Дата начала периода
             date_to: date,  # Дата окончания периода
+            required_facility_ids: list[int] | None = None,  # Удобства, которые должны быть все
     ):
-        # Подзапрос для подсчета количества занятых комнат по ID комнаты
-        rooms_ids_to_get = rooms_ids_for_booking(date_from, date_to, hotel_id, )
+        facilities_kind = facilities_filter_kind(required_facility_ids)
+        params = await availability_params(self.session, date_from, date_to, hotel_id)
+        params |= await facilities_params(self.session, facilities_kind, required_facility_ids, hotel_id)
 
+        def build():
+            query = (
+                select(self.model)
+                .options(joinedload(self.model.facilities))
+                .filter(free_rooms_condition(by_hotel=True))
+            )
+            if facilities_kind is not None:
+                query = query.filter(rooms_with_facilities(facilities_kind))
+            return query
+
+        query = statement_templates.get(
+            ("rooms.get_filtered_by_time", settings.AVAILABILITY_BACKEND, facilities_kind), build,
+        )
+        result = await self.session.execute(query, params)
+        return RoomDataWithRelsMapper.map_to_domain_entities(result.unique().scalars().all())
+
+    def _search_available_query(
+            self,
+            from_inventory: bool,
+            location: bool,
+            price_from: bool,
+            price_to: bool,
+            facilities_kind: str | None,
+            sort: str,
+    ):
+        """Шаблон запроса search_available: флаги — какие фильтры включены."""
+        rooms_left_table = rooms_left_for_period(from_inventory)
         query = (
-            select(self.model)
-            .options(joinedload(self.model.facilities))
-            .filter(RoomsORM.id.in_(rooms_ids_to_get))
+            select(
+                *RoomDataMapper.columns(),
+                rooms_left_table.c.rooms_left,
+                HotelsORM.title.label("hotel_title"),
+                HotelsORM.location.label("hotel_location"),
+            )
+            .select_from(RoomsORM)
+            .join(rooms_left_table, rooms_left_table.c.room_id == RoomsORM.id)
+            .join(HotelsORM, HotelsORM.id == RoomsORM.hotel_id)
+            .filter(rooms_left_table.c.rooms_left >= bindparam("rooms_needed", type_=Integer))
         )
-        result = await self.session.execute(query)
-        return [RoomDataWithRelsMapper.map_to_domain_entity(model) for model in result.unique().scalars().all()]
+        if location:
+            condition, _ = text_search(HotelsORM.location, "location")
+            query = query.filter(condition)
+        if price_from:
+            query = query.filter(RoomsORM.price >= bindparam("price_from", type_=Integer))
+        if price_to:
+            query = query.filter(RoomsORM.price <= bindparam("price_to", type_=Integer))
+        if facilities_kind is not None:
+            query = query.filter(rooms_with_facilities(facilities_kind))
+        order_by = {
+            "price": (RoomsORM.price, RoomsORM.id),
+            "-price": (RoomsORM.price.desc(), RoomsORM.id),
+            "hotel": (RoomsORM.hotel_id, RoomsORM.price, RoomsORM.id),
+        }[sort]
+        return query.order_by(*order_by).limit(bindparam("limit", type_=Integer))
+
+    async def search_available(
+            self,
+            date_from: date,
+            date_to: date,
+            location: str | None = None,
+            price_from: int | None = None,
+            price_to: int | None = None,
+            facilities_ids: list[int] | None = None,
+            rooms_needed: int = 1,
+            sort: str = "price",
+            limit: int = 20,
+    ) -> list[HotelRoomsAvailable]:
+        """
+        Свободные комнаты во всех отелях одним запросом, сгруппированные по отелям.
+
+        Остатки всегда считаются в SQL (по room_day_inventory, если AVAILABILITY_BACKEND=inventory,
+        иначе по бронированиям): индекс в памяти не умеет фильтровать по цене и удобствам.
+        """
+        check_period(date_from, date_to)
+        from_inventory = settings.AVAILABILITY_BACKEND == "inventory"
+        facilities_kind = facilities_filter_kind(facilities_ids)
+        params = {
+            "date_from": date_from,
+            "date_to": date_to,
+            "rooms_needed": rooms_needed,
+            "price_from": price_from,
+            "price_to": price_to,
+            "limit": limit,
+        }
+        if location:
+            params |= text_search_params("location", location)
+        params |= await facilities_params(self.session, facilities_kind, facilities_ids)
+
+        shape = (
+            "rooms.search_available", from_inventory, bool(location),
+            price_from is not None, price_to is not None, facilities_kind, sort,
+        )
+        query = statement_templates.get(shape, lambda: self._search_available_query(*shape[1:]))
+        result = await self.session.execute(query, params)
+
+        # Группируем по отелям, сохраняя порядок сортировки: отель идёт по своей первой комнате
+        hotels: dict[int, HotelRoomsAvailable] = {}
+        room_fields = list(RoomDataMapper.schema.model_fields)
+        for row in result.all():
+            room = RoomAvailable(**dict(zip(room_fields, row)), rooms_left=row.rooms_left)
+            group = hotels.get(room.hotel_id)
+            if group is None:
+                hotel = Hotel(id=room.hotel_id, title=row.hotel_title, location=row.hotel_location)
+                group = hotels[room.hotel_id] = HotelRoomsAvailable(hotel=hotel, rooms=[])
+            group.rooms.append(room)
+        return list(hotels.values())
+
+    async def check_hotel_rooms(self, hotel_id: int, rooms_ids: list[int]) -> None:
+        """404, если каких-то комнат из rooms_ids нет в отеле hotel_id."""
+        # Один параметр-массив вместо IN (...): комнат могут быть тысячи
+        query = (
+            select(RoomsORM.id)
+            .filter(RoomsORM.id == any_(literal(rooms_ids, ARRAY(Integer))))
+            .filter_by(hotel_id=hotel_id)
+        )
+        self._check_all_found(rooms_ids, (await self.session.execute(query)).all(), id_index=0)
 
     async def get_one_or_none_with_rels(self, **filter_by):
         query = (
@@ -44,3 +174,57 @@ class RoomsRepository(BaseRepository):
         if model is None:
             return None
         return RoomDataWithRelsMapper.map_to_domain_entity(model)
+
+    @staticmethod
+    def _invalidate_indexes() -> None:
+        availability_index.invalidate()
+        facilities_index.invalidate()
+
+    # Изменение состава или количества комнат делает индексы в памяти неактуальными
+    async def add(self, data):
+        room = await super().add(data)
+        self._on_commit(self._invalidate_indexes)
+        return room
+
+    async def add_many(self, data) -> list:
+        rooms = await super().add_many(data)
+        self._on_commit(self._invalidate_indexes)
+        return rooms
+
+    async def _shift_inventory(self, data, exclude_unset: bool, *filter, **filter_by) -> None:
+        new_quantity = data.model_dump(exclude_unset=exclude_unset).get("quantity")
+        if new_quantity is None:
+            return
+        # Сдвигаем остатки в room_day_inventory на разницу старого и нового количества
+        shift_inventory_stmt = (
+            update(RoomDayInventoryOrm)
+            .filter(
+                RoomDayInventoryOrm.room_id == RoomsORM.id,
+                RoomsORM.id.in_(select(RoomsORM.id).filter(*filter).filter_by(**filter_by)),
+            )
+            .values(rooms_left=RoomDayInventoryOrm.rooms_left + (new_quantity - RoomsORM.quantity))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(shift_inventory_stmt)
+
+    async def edit(self, data, exclude_unset: bool = False, **filter_by) -> list:
+        await self._shift_inventory(data, exclude_unset, **filter_by)
+        rooms = await super().edit(data, exclude_unset=exclude_unset, **filter_by)
+        self._on_commit(self._invalidate_indexes)
+        return rooms
+
+    async def edit_many(self, data, ids: list[int], exclude_unset: bool = False) -> list:
+        await self._shift_inventory(data, exclude_unset, RoomsORM.id.in_(ids))
+        rooms = await super().edit_many(data, ids, exclude_unset=exclude_unset)
+        self._on_commit(self._invalidate_indexes)
+        return rooms
+
+    async def delete(self, **filter_by) -> list:
+        rooms = await super().delete(**filter_by)
+        self._on_commit(self._invalidate_indexes)
+        return rooms
+
+    async def delete_many(self, ids: list[int]) -> list:
+        rooms = await super().delete_many(ids)
+        self._on_commit(self._invalidate_indexes)
+        return rooms
@@ -1,26 +1,77 @@
 from datetime import date
-from sqlalchemy import select, func
+from fastapi import HTTPException
+from sqlalchemy import select, func, literal_column, bindparam, any_, Date, Integer, BigInteger
+from sqlalchemy.dialects.postgresql import ARRAY
 
-from src.models.bookings import BookingOrm
+from src.config import settings
+from src.models.bookings import BookingOrm, booked_period
+from src.models.facilities import RoomsFacilitiesOrm
+from src.models.hotels import HotelsORM
+from src.models.room_inventory import RoomDayInventoryOrm
 from src.models.rooms import RoomsORM
+from src.utils.availability import availability_index
+from src.utils.facilities_bitset import facilities_index, facilities_mask, fits_mask
 
+# Запросы ниже — шаблоны для src/utils/statement_cache.py: значения в них не подставлены,
+# а заданы параметрами (:date_from, :hotel_id, ...), которые передаются в session.execute
 
-def rooms_ids_for_booking(
-        date_from: date,
-        date_to: date,
-        hotel_id: int | None = None,
-):
-    rooms_count = (
-        select(BookingOrm.room_id, func.count("*").label("rooms_booked"))
-        .select_from(BookingOrm)
-        .filter(
-            BookingOrm.date_from <= date_to,
-            BookingOrm.date_to >= date_from,
+
+def check_period(date_from: date, date_to: date) -> None:
+    if date_to < date_from:
+        # daterange() в Postgres отвергает такой период ошибкой, а не пустым результатом
+        raise HTTPException(status_code=400, detail="Дата выезда раньше даты заезда")
+
+
+def rooms_left_for_period(from_inventory: bool = False):
+    """
+    CTE rooms_left_table (room_id, rooms_left): сколько номеров каждой комнаты свободно
+    на весь период [:date_from, :date_to] — по бронированиям или по остаткам room_day_inventory.
+    """
+    date_from = bindparam("date_from", type_=Date)
+    date_to = bindparam("date_to", type_=Date)
+    if from_inventory:
+        # Свободно столько, сколько осталось в самый загруженный день; нет строк — вся квота
+        min_left = (
+            select(RoomDayInventoryOrm.room_id, func.min(RoomDayInventoryOrm.rooms_left).label("rooms_left"))
+            .filter(RoomDayInventoryOrm.day.between(date_from, date_to))
+            .group_by(RoomDayInventoryOrm.room_id)
+            .cte(name="rooms_min_left")
         )
-        .group_by(BookingOrm.room_id)
+        return (
+            select(
+                RoomsORM.id.label("room_id"),
+                func.coalesce(min_left.c.rooms_left, RoomsORM.quantity).label("rooms_left"),
+            )
+            .select_from(RoomsORM)
+            .outerjoin(min_left, RoomsORM.id == min_left.c.room_id)
+            .cte(name="rooms_left_table")
+        )
+    # Дни периода, занятые каждым пересекающимся бронированием; пересечение периодов
+    # через && обслуживается GiST-индексом ix_bookings_daterange
+    booked_days = (
+        select(
+            BookingOrm.room_id,
+            func.generate_series(
+                func.greatest(BookingOrm.date_from, date_from),
+                func.least(BookingOrm.date_to, date_to),
+                literal_column("interval '1 day'"),
+            ).label("day"),
+        )
+        .filter(booked_period.op("&&")(func.daterange(date_from, date_to, literal_column("'[]'"))))
+        .subquery(name="booked_days")
+    )
+    booked_per_day = (
+        select(booked_days.c.room_id, func.count("*").label("rooms_booked"))
+        .group_by(booked_days.c.room_id, booked_days.c.day)
+        .subquery(name="booked_per_day")
+    )
+    # Занято столько, сколько в самый загруженный день периода — как в room_day_inventory
+    rooms_count = (
+        select(booked_per_day.c.room_id, func.max(booked_per_day.c.rooms_booked).label("rooms_booked"))
+        .group_by(booked_per_day.c.room_id)
         .cte(name="rooms_count")
     )
-    rooms_left_table = (
+    return (
         select(
             RoomsORM.id.label("room_id"),
             (RoomsORM.quantity - func.coalesce(rooms_count.c.rooms_booked, 0)).label("rooms_left"),
@@ -29,12 +80,19 @@ def rooms_ids_for_booking(
         .outerjoin(rooms_count, RoomsORM.id == rooms_count.c.room_id)
         .cte(name="rooms_left_table")
     )
+
+
+def free_rooms_ids_query(by_hotel: bool = False, from_inventory: bool = False):
+    """ID комнат со свободными номерами на [:date_from, :date_to]; с by_hotel — только отеля :hotel_id."""
+    if from_inventory:
+        return rooms_ids_from_inventory(by_hotel)
+    rooms_left_table = rooms_left_for_period()
     rooms_ids_for_hotel = (
         select(RoomsORM.id)
         .select_from(RoomsORM)
     )
-    if hotel_id is not None:
-        rooms_ids_for_hotel = rooms_ids_for_hotel.filter_by(hotel_id=hotel_id)
+    if by_hotel:
+        rooms_ids_for_hotel = rooms_ids_for_hotel.filter(RoomsORM.hotel_id == bindparam("hotel_id", type_=Integer))
     rooms_ids_for_hotel = (
         rooms_ids_for_hotel
         .subquery(name="rooms_ids_for_hotel")
@@ -44,7 +102,147 @@ def rooms_ids_for_booking(
         .select_from(rooms_left_table)
         .filter(
             rooms_left_table.c.rooms_left > 0,
-            rooms_left_table.c.room_id.in_(rooms_ids_for_hotel),
+            rooms_left_table.c.room_id.in_(select(rooms_ids_for_hotel.c.id)),
+        )
+    )
+    return rooms_ids_to_get
+
+
+def rooms_ids_for_booking(
+        date_from: date,
+        date_to: date,
+        hotel_id: int | None = None,
+        from_inventory: bool = False,
+):
+    """free_rooms_ids_query с подставленными значениями — для разовых запросов и скриптов."""
+    check_period(date_from, date_to)
+    query = free_rooms_ids_query(by_hotel=hotel_id is not None, from_inventory=from_inventory)
+    return query.params(date_from=date_from, date_to=date_to, hotel_id=hotel_id)
+
+
+def rooms_ids_from_inventory(by_hotel: bool = False):
+    """
+    То же, что free_rooms_ids_query, но по готовым остаткам из room_day_inventory:
+    комната свободна, если ни на один день интервала у неё не закончились номера.
+    """
+    sold_out_rooms_ids = (
+        select(RoomDayInventoryOrm.room_id)
+        .filter(
+            RoomDayInventoryOrm.day.between(bindparam("date_from", type_=Date), bindparam("date_to", type_=Date)),
+            RoomDayInventoryOrm.rooms_left <= 0,
+        )
+    )
+    rooms_ids_to_get = (
+        select(RoomsORM.id)
+        .filter(
+            RoomsORM.quantity > 0,
+            RoomsORM.id.not_in(sold_out_rooms_ids),
         )
     )
+    if by_hotel:
+        rooms_ids_to_get = rooms_ids_to_get.filter(RoomsORM.hotel_id == bindparam("hotel_id", type_=Integer))
     return rooms_ids_to_get
+
+
+def free_rooms_condition(by_hotel: bool = False):
+    """
+    Условие на RoomsORM "у комнаты есть свободные номера" для текущего AVAILABILITY_BACKEND.
+    Параметры даёт availability_params; для memory это готовый список :free_rooms_ids.
+    """
+    if settings.AVAILABILITY_BACKEND == "memory":
+        return RoomsORM.id == any_(bindparam("free_rooms_ids", type_=ARRAY(Integer)))
+    return RoomsORM.id.in_(
+        free_rooms_ids_query(by_hotel, from_inventory=settings.AVAILABILITY_BACKEND == "inventory")
+    )
+
+
+def free_hotels_condition():
+    """Условие на HotelsORM "в отеле есть свободные номера", параметры — availability_params(hotels=True)."""
+    if settings.AVAILABILITY_BACKEND == "memory":
+        return HotelsORM.id == any_(bindparam("free_hotels_ids", type_=ARRAY(Integer)))
+    hotels_ids = (
+        select(RoomsORM.hotel_id)
+        .select_from(RoomsORM)
+        .filter(free_rooms_condition())
+    )
+    return HotelsORM.id.in_(hotels_ids)
+
+
+async def availability_params(
+        session,
+        date_from: date,
+        date_to: date,
+        hotel_id: int | None = None,
+        hotels: bool = False,
+) -> dict:
+    """Параметры для free_rooms_condition (или free_hotels_condition, если hotels)."""
+    check_period(date_from, date_to)
+    params = {"date_from": date_from, "date_to": date_to, "hotel_id": hotel_id}
+    if settings.AVAILABILITY_BACKEND == "memory":
+        await availability_index.ensure_loaded(session)
+        if hotels:
+            params["free_hotels_ids"] = availability_index.free_hotels_ids(date_from, date_to)
+        else:
+            params["free_rooms_ids"] = availability_index.free_rooms_ids(date_from, date_to, hotel_id)
+    return params
+
+
+def facilities_filter_kind(facilities_ids: list[int]) -> str | None:
+    """
+    Как проверять "у комнаты есть все удобства": mask — побитово по rooms.facilities_mask,
+    memory — по маскам в памяти, join — через rooms_facilities, если какому-то удобству
+    не хватило бита (id больше MAX_MASK_FACILITY_ID). None — фильтра нет.
+    """
+    if not facilities_ids:
+        return None
+    if not fits_mask(facilities_ids):
+        return "join"
+    return "memory" if settings.FACILITIES_FILTER_BACKEND == "memory" else "mask"
+
+
+def rooms_with_facilities(kind: str):
+    """Условие на RoomsORM для facilities_filter_kind; параметры даёт facilities_params."""
+    if kind == "memory":
+        return RoomsORM.id == any_(bindparam("facility_rooms_ids", type_=ARRAY(Integer)))
+    if kind == "mask":
+        required = bindparam("required_mask", type_=BigInteger)
+        return RoomsORM.facilities_mask.bitwise_and(required) == required
+    rooms_ids = (
+        select(RoomsFacilitiesOrm.room_id)
+        .filter(RoomsFacilitiesOrm.facility_id == any_(bindparam("facilities_ids", type_=ARRAY(Integer))))
+        .group_by(RoomsFacilitiesOrm.room_id)
+        .having(func.count(RoomsFacilitiesOrm.facility_id.distinct()) == bindparam("facilities_count", type_=Integer))
+    )
+    return RoomsORM.id.in_(rooms_ids)
+
+
+async def facilities_params(session, kind: str | None, facilities_ids: list[int], hotel_id: int | None = None) -> dict:
+    if kind is None:
+        return {}
+    facilities_ids = sorted(set(facilities_ids))
+    if kind == "memory":
+        await facilities_index.ensure_loaded(session)
+        return {"facility_rooms_ids": facilities_index.rooms_ids(facilities_mask(facilities_ids), hotel_id)}
+    if kind == "mask":
+        return {"required_mask": facilities_mask(facilities_ids)}
+    return {"facilities_ids": facilities_ids, "facilities_count": len(facilities_ids)}
+
+
+def text_search(column, name: str, ranked: bool = False):
+    """
+    Условие подстрочного поиска без учёта регистра и, если нужно, ранг совпадения.
+    Значения — параметры :{name}_pattern и :{name}_value, их даёт text_search_params.
+
+    Шаблон LIKE собирается на стороне Python, чтобы Postgres видел его целиком
+    и мог использовать GIN-индекс gin_trgm_ops по lower(column).
+    Ранг (word_similarity из pg_trgm) доступен только в Postgres.
+    """
+    condition = func.lower(column).like(bindparam(f"{name}_pattern", type_=column.type), escape="\\")
+    rank = func.word_similarity(bindparam(f"{name}_value", type_=column.type), func.lower(column)) if ranked else None
+    return condition, rank
+
+
+def text_search_params(name: str, value: str) -> dict:
+    value = value.strip().lower()
+    pattern = "%" + value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    return {f"{name}_pattern": pattern, f"{name}_value": value}
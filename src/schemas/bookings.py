@@ -2,6 +2,8 @@ from datetime import date
 
 from pydantic import BaseModel, ConfigDict
 
+from src.schemas.status import StatusResponse
+
 
 class BookingAddRequest(BaseModel):
     # user_id: int
@@ -21,4 +23,15 @@ class BookingAdd(BaseModel):
 class Booking(BookingAdd):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BookingsImportChunk(BaseModel):
+    rows: int
+    seconds: float
+    rows_per_second: float | None
+
+
+class BookingsImportResult(StatusResponse):
+    imported: int
+    chunks: list[BookingsImportChunk]
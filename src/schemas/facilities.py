@@ -1,5 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 
+from src.schemas.status import StatusResponse
+
 
 class FacilityAdd(BaseModel):
     title: str
@@ -18,3 +20,7 @@ class RoomFacilityAdd(BaseModel):
 
 class RoomsFacility(RoomFacilityAdd):
     id: int
+
+
+class RoomsFacilitiesSetResult(StatusResponse):
+    changed_rooms_ids: list[int]
@@ -6,6 +6,10 @@ class HotelAdd(BaseModel):
     location: str
 
 
+class HotelAddBulk(HotelAdd):
+    key: str  # Ключ клиента, по нему в ответе придёт id
+
+
 class Hotel(HotelAdd):
     id: int
 
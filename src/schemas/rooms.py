@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict, Field
 
 from src.schemas.facilities import Facility
+from src.schemas.hotels import Hotel
 
 
 class RoomAddRequest(BaseModel):
@@ -11,6 +12,10 @@ class RoomAddRequest(BaseModel):
     facilities_ids: list[int] = []
 
 
+class RoomAddBulk(RoomAddRequest):
+    key: str  # Ключ клиента, по нему в ответе придёт id
+
+
 class RoomAdd(BaseModel):
     hotel_id: int
     title: str
@@ -29,6 +34,15 @@ class RoomWithRels(Room):
     facilities: list[Facility]
 
 
+class RoomAvailable(Room):
+    rooms_left: int
+
+
+class HotelRoomsAvailable(BaseModel):
+    hotel: Hotel
+    rooms: list[RoomAvailable]
+
+
 class RoomPatchRequest(BaseModel):
     title: str | None = None
     description: str | None = None
@@ -0,0 +1,17 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+DataT = TypeVar("DataT")
+
+
+class StatusResponse(BaseModel):
+    status: str
+
+
+class DataResponse(StatusResponse, Generic[DataT]):
+    data: DataT
+
+
+class BulkCreateResult(StatusResponse):
+    ids: dict[str, int]  # Ключ клиента -> id созданной записи
@@ -1,9 +1,14 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import timedelta, datetime, timezone
+
 import jwt
 from fastapi import HTTPException
 from passlib.context import CryptContext
 
 from src.config import settings
+from src.utils.cache import TTLCache
 
 
 class AuthService:
@@ -22,8 +27,109 @@ class AuthService:
     def verify_password(self, plain_password, hashed_password):
         return self.pwd_context.verify(plain_password, hashed_password)
 
+    async def hash_password_async(self, password: str) -> str:
+        return await password_hasher.run(_hash_password, password)
+
+    async def verify_password_async(self, plain_password, hashed_password) -> bool:
+        return await password_hasher.run(_verify_password, plain_password, hashed_password)
+
     def encode_token(self, token: str) -> dict:
         try:
             return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=settings.JWT_ALGORITHM)
         except jwt.exceptions.DecodeError:
             raise HTTPException(status_code=401, detail="Неверный токен")
+
+    def encode_token_cached(self, token: str) -> dict:
+        """
+        encode_token с кэшем по самому токену: клиенты присылают один и тот же токен
+        тысячи раз, а проверка подписи каждый раз тратит CPU. Запись живёт до exp токена.
+        """
+        data = token_cache.get(token)
+        if data is None:
+            data = self.encode_token(token)
+            if "exp" in data:
+                token_cache.set(token, data, expires_at=data["exp"])
+        return data
+
+
+# Функции уровня модуля, чтобы их можно было передать в ProcessPoolExecutor
+def _hash_password(password: str) -> str:
+    return AuthService.pwd_context.hash(password)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    return AuthService.pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Ограниченный пул для bcrypt.
+
+    Хеширование занимает десятки миллисекунд CPU, поэтому выполняется в пуле потоков
+    (bcrypt отпускает GIL) или процессов. Очередь ограничена: когда все воркеры заняты
+    и ждущих больше max_queue, запрос сразу получает 503 вместо бесконечного ожидания.
+    """
+
+    def __init__(self, executor: str, workers: int, max_queue: int):
+        self.executor_kind = executor
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Executor | None = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            executor_class = ProcessPoolExecutor if self.executor_kind == "process" else ThreadPoolExecutor
+            self._executor = executor_class(max_workers=self.workers)
+        return self._executor
+
+    async def run(self, func, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Сервер перегружен, повторите попытку позже",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": max(self.in_flight - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_latency_ms": self.total_seconds / self.completed * 1e3 if self.completed else 0.0,
+            "max_latency_ms": self.max_seconds * 1e3,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+token_cache = TTLCache(maxsize=settings.JWT_CACHE_SIZE)
+
+password_hasher = PasswordHasher(
+    executor=settings.AUTH_HASH_EXECUTOR,
+    workers=settings.AUTH_HASH_WORKERS,
+    max_queue=settings.AUTH_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,116 @@
+from datetime import date
+
+import numpy as np
+from sqlalchemy import select
+
+from src.config import settings
+from src.models.bookings import BookingOrm
+from src.models.rooms import RoomsORM
+from src.utils.memory_index import RoomsMemoryIndex
+
+
+class AvailabilityIndex(RoomsMemoryIndex):
+    """
+    Индекс свободных номеров в памяти процесса.
+
+    Хранит матрицу занятости "день x тип комнаты" (сколько номеров забронировано
+    на каждый день) и отвечает на вопрос "какие комнаты имеют rooms_left > 0
+    в интервале [date_from, date_to]" векторизованным максимумом по диапазону дней.
+    Комната свободна, если свободный номер есть в каждый день интервала — так же считают
+    room_day_inventory, reserve_rooms при бронировании и SQL-путь rooms_left_for_period.
+    Интервалы включают обе границы.
+
+    Перестраивается не реже раза в AVAILABILITY_INDEX_TTL секунд, см. RoomsMemoryIndex.
+    """
+
+    def reset(self) -> None:
+        super().reset()
+        self.start_day = 0  # Порядковый номер (date.toordinal) первого дня матрицы
+        self.hotel_ids = np.empty(0, dtype=np.int64)
+        self.quantity = np.empty(0, dtype=np.int32)
+        self.booked = np.zeros((0, 0), dtype=np.int32)
+
+    async def fetch(self, session) -> None:
+        rooms_query = select(RoomsORM.id, RoomsORM.hotel_id, RoomsORM.quantity).order_by(RoomsORM.id)
+        bookings_query = select(BookingOrm.room_id, BookingOrm.date_from, BookingOrm.date_to)
+        rooms = (await session.execute(rooms_query)).all()
+        bookings = (await session.execute(bookings_query)).all()
+        self.build(rooms, bookings)
+
+    def build(self, rooms, bookings) -> None:
+        """
+        Строит индекс из строк (room_id, hotel_id, quantity) и (room_id, date_from, date_to).
+        """
+        self.room_ids = np.fromiter((r[0] for r in rooms), dtype=np.int64, count=len(rooms))
+        self.hotel_ids = np.fromiter((r[1] for r in rooms), dtype=np.int64, count=len(rooms))
+        self.quantity = np.fromiter((r[2] for r in rooms), dtype=np.int32, count=len(rooms))
+
+        b_rooms = np.fromiter((b[0] for b in bookings), dtype=np.int64, count=len(bookings))
+        b_from = np.fromiter((b[1].toordinal() for b in bookings), dtype=np.int64, count=len(bookings))
+        b_to = np.fromiter((b[2].toordinal() for b in bookings), dtype=np.int64, count=len(bookings))
+
+        # Бронирования несуществующих комнат (или с перепутанными датами) не учитываем
+        rows = np.searchsorted(self.room_ids, b_rooms)
+        rows = np.minimum(rows, max(len(self.room_ids) - 1, 0))
+        known = (len(self.room_ids) > 0) & (b_from <= b_to)
+        if len(self.room_ids):
+            known &= self.room_ids[rows] == b_rooms
+        rows, b_from, b_to = rows[known], b_from[known], b_to[known]
+
+        if len(rows):
+            self.start_day = int(b_from.min())
+            n_days = int(b_to.max()) - self.start_day + 1
+        else:
+            self.start_day = date.today().toordinal()
+            n_days = 1
+
+        # Разностный массив: +1 в день заезда, -1 на следующий день после выезда,
+        # затем накопленная сумма по дням даёт занятость на каждый день.
+        diff = np.zeros((n_days + 1, len(self.room_ids)), dtype=np.int32)
+        np.add.at(diff, (b_from - self.start_day, rows), 1)
+        np.add.at(diff, (b_to - self.start_day + 1, rows), -1)
+        self.booked = np.cumsum(diff[:-1], axis=0, dtype=np.int32)
+        self._mark_loaded()
+
+    def _ensure_days(self, first_day: int, last_day: int) -> None:
+        n_days, n_rooms = self.booked.shape
+        if first_day < self.start_day:
+            head = np.zeros((self.start_day - first_day, n_rooms), dtype=np.int32)
+            self.booked = np.concatenate([head, self.booked])
+            self.start_day = first_day
+            n_days = self.booked.shape[0]
+        if last_day >= self.start_day + n_days:
+            tail = np.zeros((last_day - self.start_day - n_days + 1, n_rooms), dtype=np.int32)
+            self.booked = np.concatenate([self.booked, tail])
+
+    def add_booking(self, room_id: int, date_from: date, date_to: date) -> None:
+        """Инкрементально учитывает новое бронирование."""
+        if date_from > date_to:
+            return
+        row = self._room_row(room_id)
+        if row is None:
+            return
+        first_day, last_day = date_from.toordinal(), date_to.toordinal()
+        self._ensure_days(first_day, last_day)
+        self.booked[first_day - self.start_day:last_day - self.start_day + 1, row] += 1
+
+    def free_mask(self, date_from: date, date_to: date) -> np.ndarray:
+        """Маска комнат, у которых в каждый день интервала остаются свободные номера."""
+        first = max(date_from.toordinal() - self.start_day, 0)
+        last = min(date_to.toordinal() - self.start_day, self.booked.shape[0] - 1)
+        if first > last:
+            return self.quantity > 0
+        peak = self.booked[first:last + 1].max(axis=0)
+        return self.quantity - peak > 0
+
+    def free_rooms_ids(self, date_from: date, date_to: date, hotel_id: int | None = None) -> list[int]:
+        mask = self.free_mask(date_from, date_to)
+        if hotel_id is not None:
+            mask &= self.hotel_ids == hotel_id
+        return self.room_ids[mask].tolist()
+
+    def free_hotels_ids(self, date_from: date, date_to: date) -> list[int]:
+        return np.unique(self.hotel_ids[self.free_mask(date_from, date_to)]).tolist()
+
+
+availability_index = AvailabilityIndex(ttl=settings.AVAILABILITY_INDEX_TTL)
@@ -0,0 +1,114 @@
+import csv
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+
+# Сколько ошибок валидации возвращать клиенту, чтобы ответ не рос вместе с файлом
+MAX_REPORTED_ERRORS = 20
+
+
+async def _line_chunks(stream):
+    """Режет поток байтов на строки, отдавая их пачками по мере поступления."""
+    tail = b""
+    async for chunk in stream:
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        yield lines
+    if tail:
+        yield [tail]
+
+
+def _raise_invalid(errors: list[dict]) -> None:
+    raise HTTPException(status_code=422, detail=errors[:MAX_REPORTED_ERRORS])
+
+
+def _validate(adapter: TypeAdapter, batch: list, numbers: list[int], media_type: str) -> list:
+    try:
+        if media_type == NDJSON:
+            return adapter.validate_json(b"[" + b",".join(batch) + b"]")
+        return adapter.validate_python(batch)
+    except ValidationError as e:
+        # Ошибка синтаксиса JSON относится ко всей пачке, а не к конкретной строке
+        _raise_invalid([
+            {
+                "line": numbers[error["loc"][0]] if error["loc"] else None,
+                "loc": error["loc"][1:],
+                "msg": error["msg"],
+            }
+            for error in e.errors(include_url=False, include_input=False)
+        ])
+
+
+def _checked(items: list, numbers: list[int], check) -> list:
+    if check is not None:
+        errors = [
+            {"line": number, "loc": [], "msg": message}
+            for item, number in zip(items, numbers)
+            if (message := check(item))
+        ]
+        if errors:
+            _raise_invalid(errors)
+    return items
+
+
+async def read_batches(stream, media_type: str, schema, batch_size: int, check=None):
+    """
+    Читает тело запроса в NDJSON или CSV (с заголовком) и отдаёт списки схем
+    по batch_size штук, валидируя каждую пачку одним вызовом TypeAdapter.
+
+    check(item) может вернуть текст ошибки для строки, прошедшей валидацию схемы.
+    При первой же плохой пачке — 422 с номерами строк. CSV читается построчно,
+    переносы строк внутри значений не поддерживаются.
+    """
+    adapter = TypeAdapter(list[schema])
+    header = None
+    batch, numbers = [], []
+    line_number = 0
+    async for lines in _line_chunks(stream):
+        for line in lines:
+            line_number += 1
+            line = line.rstrip(b"\r")
+            if not line.strip():
+                continue
+            if media_type == CSV:
+                row = next(csv.reader([line.decode(errors="replace")]))
+                if header is None:
+                    header = row
+                    continue
+                line = dict(zip(header, row))
+            batch.append(line)
+            numbers.append(line_number)
+            if len(batch) >= batch_size:
+                yield _checked(_validate(adapter, batch, numbers, media_type), numbers, check)
+                batch, numbers = [], []
+    if batch:
+        yield _checked(_validate(adapter, batch, numbers, media_type), numbers, check)
+
+
+def request_body_openapi(schema) -> dict:
+    """Описание тела для OpenAPI: FastAPI не выводит его сам, когда эндпоинт читает поток."""
+    columns = ", ".join(schema.model_fields)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                NDJSON: {"schema": {"type": "string", "description": f"По объекту на строку: {columns}"}},
+                CSV: {"schema": {"type": "string", "description": f"Первая строка — заголовок: {columns}"}},
+            },
+        },
+    }
+
+
+def check_unique_keys(items: list) -> None:
+    """422, если в массиве для пакетного создания повторяются ключи клиента."""
+    seen = set()
+    errors = []
+    for index, item in enumerate(items):
+        if item.key in seen:
+            errors.append({"loc": ["body", index, "key"], "msg": f"Ключ {item.key!r} повторяется"})
+        seen.add(item.key)
+    if errors:
+        _raise_invalid(errors)
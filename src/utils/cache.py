@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+
+from src.config import settings
+
+
+class TTLCache:
+    """
+    Ограниченный по размеру LRU-кэш с временем жизни записей.
+
+    Безопасен для конкурентного доступа из нескольких потоков: синхронные
+    зависимости FastAPI выполняются в пуле потоков. Время — time.time(),
+    чтобы срок жизни можно было задавать абсолютной меткой (например, exp из JWT).
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float | None = None, expires_at: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+MISSING = object()
+
+
+class CacheBackend:
+    """
+    Хранилище для кэша репозиториев. Методы асинхронные, чтобы за этим интерфейсом
+    можно было поставить внешнее хранилище (Redis, memcached) без изменения репозиториев.
+    Промах обозначается MISSING: None — нормальное закэшированное значение.
+    """
+
+    async def get(self, namespace: str, key):
+        raise NotImplementedError
+
+    async def set(self, namespace: str, key, value, ttl: float | None = None) -> None:
+        raise NotImplementedError
+
+    async def invalidate(self, namespace: str) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    TTL+LRU в памяти процесса. Инвалидация пространства имён — смена его поколения:
+    ключи содержат номер поколения, а старые записи вытесняются сами по LRU и TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: dict[str, int] = {}
+        self.invalidations = 0
+
+    async def get(self, namespace: str, key):
+        return self._cache.get((namespace, self._generations.get(namespace, 0), key), MISSING)
+
+    async def set(self, namespace: str, key, value, ttl: float | None = None) -> None:
+        self._cache.set((namespace, self._generations.get(namespace, 0), key), value, ttl=ttl)
+
+    async def invalidate(self, namespace: str) -> None:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return self._cache.stats() | {"invalidations": self.invalidations}
+
+
+_repository_cache: CacheBackend | None = None
+if settings.REPOSITORY_CACHE_BACKEND == "memory":
+    _repository_cache = InMemoryCacheBackend(maxsize=settings.REPOSITORY_CACHE_SIZE, ttl=settings.REPOSITORY_CACHE_TTL)
+
+
+def configure_repository_cache(backend: CacheBackend | None) -> None:
+    """Подключает хранилище для кэша репозиториев; None отключает кэш."""
+    global _repository_cache
+    _repository_cache = backend
+
+
+def get_repository_cache() -> CacheBackend | None:
+    return _repository_cache
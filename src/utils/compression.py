@@ -0,0 +1,129 @@
+"""
+Сжатие ответов: gzip и, если установлен пакет brotli, br.
+
+Кодировка выбирается по Accept-Encoding (br предпочтительнее при равном q). Не сжимаются
+ответы меньше COMPRESSION_MINIMUM_SIZE, уже сжатые (есть Content-Encoding) и форматы,
+которые сжатием не уменьшить (картинки, архивы). Потоковые ответы сжимаются по частям.
+"""
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from src.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+# Типы содержимого, которые уже сжаты
+INCOMPRESSIBLE_TYPES = ("image/", "video/", "audio/", "font/woff", "application/zip", "application/gzip",
+                        "application/x-brotli", "application/octet-stream")
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """Лучшая из поддерживаемых кодировок по заголовку Accept-Encoding или None."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best = max(candidates, key=lambda name: weights.get(name, weights.get("*", 0.0)))
+    return best if weights.get(best, weights.get("*", 0.0)) > 0 else None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._br = None
+            # wbits=31 — формат gzip (заголовок и контрольная сумма)
+            self._gzip = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._br is not None:
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._gzip.compress(data)
+        return out + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """ASGI-middleware сжатия ответов."""
+
+    def __init__(self, app, minimum_size: int | None = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        compressor = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or (start_message is None and compressor is None):
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                # Первая часть тела: решаем, сжимать ли ответ
+                start, start_message = start_message, None
+                headers = MutableHeaders(raw=start["headers"])
+                if not self._should_compress(headers, body, more_body):
+                    await send(start)
+                    return await send(message)
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                # Сжатое тело отличается побайтно — сильный ETag становится слабым
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                data = compressor.compress(body, final=not more_body)
+                if not more_body:
+                    headers["Content-Length"] = str(len(data))
+                await send(start)
+                return await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type or content_type.startswith(INCOMPRESSIBLE_TYPES):
+            return False
+        if more_body:
+            # Потоковый ответ: размер известен, только если его объявили
+            content_length = headers.get("content-length")
+            return content_length is None or int(content_length) >= self.minimum_size
+        return len(body) >= self.minimum_size
@@ -1,3 +1,7 @@
+import inspect
+from functools import cached_property
+
+from src.database import readonly_engine
 from src.repositories.bookings import BookingsRepository
 from src.repositories.hotels import HotelsRepository
 from src.repositories.rooms import RoomsRepository
@@ -6,25 +10,67 @@ from src.repositories.facilities import FacilitiesRepository, RoomsFacilitiesRep
 
 
 class DBManager:
+    """
+    Единица работы на запрос.
+
+    Сессия и репозитории создаются лениво, при первом обращении, а соединение
+    из пула берётся только на первом реальном запросе к БД. С read_only=True
+    транзакция открывается как READ ONLY.
+    """
 
-    def __init__(self, session_factory):
+    def __init__(self, session_factory, read_only: bool = False):
         self.session_factory = session_factory
+        self.read_only = read_only
+        self._session = None
 
-    async def __aenter__(self):
-        self.session = self.session_factory()
+    @property
+    def session(self):
+        if self._session is None:
+            if self.read_only:
+                self._session = self.session_factory(bind=readonly_engine)
+            else:
+                self._session = self.session_factory()
+        return self._session
+
+    @cached_property
+    def hotels(self) -> HotelsRepository:
+        return HotelsRepository(self.session)
+
+    @cached_property
+    def rooms(self) -> RoomsRepository:
+        return RoomsRepository(self.session)
 
-        self.hotels = HotelsRepository(self.session)
-        self.rooms = RoomsRepository(self.session)
-        self.users = UsersRepository(self.session)
-        self.bookings = BookingsRepository(self.session)
-        self.facilities = FacilitiesRepository(self.session)
-        self.rooms_facilities = RoomsFacilitiesRepository(self.session)
+    @cached_property
+    def users(self) -> UsersRepository:
+        return UsersRepository(self.session)
 
+    @cached_property
+    def bookings(self) -> BookingsRepository:
+        return BookingsRepository(self.session)
+
+    @cached_property
+    def facilities(self) -> FacilitiesRepository:
+        return FacilitiesRepository(self.session)
+
+    @cached_property
+    def rooms_facilities(self) -> RoomsFacilitiesRepository:
+        return RoomsFacilitiesRepository(self.session)
+
+    async def __aenter__(self):
         return self
 
     async def __aexit__(self, *args):
-        await self.session.rollback()
-        await self.session.close()
+        if self._session is None:
+            return
+        # Если запросов не было или транзакция уже зафиксирована, соединение не занято
+        # и закрывать нечего. Иначе close() сам откатывает транзакцию и возвращает соединение в пул.
+        if self._session.in_transaction():
+            await self._session.close()
 
     async def commit(self):
         await self.session.commit()
+        # Выполняем действия, которые репозитории отложили до фиксации транзакции
+        for callback in self.session.info.pop("on_commit", []):
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
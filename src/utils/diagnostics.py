@@ -0,0 +1,121 @@
+"""
+Диагностика SQL: лог медленных запросов и поиск N+1.
+
+Включается настройкой DIAGNOSTICS_ENABLED: тогда src/database.py вешает слушатели
+на движок (install), а src/main.py — DiagnosticsMiddleware. Формой запроса считается его текст
+с плейсхолдерами: один и тот же SELECT с разными параметрами — одна форма.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from src.config import settings
+from src.utils.metrics import current_call
+
+logger = logging.getLogger(__name__)
+
+# Сколько символов SQL и параметров писать в лог
+MAX_LOGGED_CHARS = 500
+
+
+class StatementLog:
+    """SQL-запросы, выполненные внутри capture_statements()."""
+
+    def __init__(self):
+        self.count = 0
+        self.shapes: Counter = Counter()  # текст запроса -> сколько раз выполнен
+        self.callers: dict[str, str | None] = {}  # текст запроса -> первый вызвавший метод репозитория
+
+    def problems(
+            self,
+            max_statements: int | None = None,
+            repeat_limit: int | None = None,
+    ) -> list[str]:
+        max_statements = settings.DIAGNOSTICS_MAX_STATEMENTS if max_statements is None else max_statements
+        repeat_limit = settings.DIAGNOSTICS_REPEAT_LIMIT if repeat_limit is None else repeat_limit
+        problems = []
+        if self.count > max_statements:
+            problems.append(f"{self.count} SQL-запросов (лимит {max_statements})")
+        for statement, count in self.shapes.most_common():
+            if count < repeat_limit:
+                break
+            problems.append(
+                f"N+1: запрос выполнен {count} раз ({self.callers[statement] or 'вне репозитория'}): "
+                f"{_short(statement)}"
+            )
+        return problems
+
+
+_statement_log: ContextVar[StatementLog | None] = ContextVar("statement_log", default=None)
+
+
+@contextmanager
+def capture_statements():
+    """Собирает SQL-запросы, выполненные в этом контексте (запрос, тест, скрипт)."""
+    log = StatementLog()
+    token = _statement_log.set(log)
+    try:
+        yield log
+    finally:
+        _statement_log.reset(token)
+
+
+def _short(value) -> str:
+    text = " ".join(str(value).split())
+    return text if len(text) <= MAX_LOGGED_CHARS else text[:MAX_LOGGED_CHARS] + "..."
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._diagnostics_start = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - context._diagnostics_start) * 1e3
+    caller = current_call.get()
+    if elapsed_ms >= settings.DIAGNOSTICS_SLOW_QUERY_MS:
+        logger.warning(
+            "Медленный запрос %.1f мс (%s): %s; параметры: %s",
+            elapsed_ms, caller or "вне репозитория", _short(statement), _short(parameters),
+        )
+    log = _statement_log.get()
+    if log is not None:
+        log.count += 1
+        log.shapes[statement] += 1
+        log.callers.setdefault(statement, caller)
+
+
+def install(engine) -> None:
+    """Вешает слушатели диагностики на async-движок."""
+    if not event.contains(engine.sync_engine, "after_cursor_execute", after_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+class DiagnosticsMiddleware:
+    """
+    Собирает SQL-запросы каждого HTTP-запроса, отдаёт их число в заголовке X-DB-Statements
+    и пишет предупреждение, если запросов слишком много или видна картина N+1.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with capture_statements() as log:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", []), (b"x-db-statements", str(log.count).encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        route = getattr(scope.get("route"), "path", scope["path"])
+        for problem in log.problems():
+            logger.warning("%s %s: %s", scope["method"], route, problem)
@@ -0,0 +1,75 @@
+"""
+Swagger UI со своего сервера вместо unpkg.
+
+Файлы скачиваются один раз и сразу сжимаются (gzip и, если есть brotli, br):
+
+    python -m src.utils.docs_assets static/swagger-ui
+
+после чего в .env задаётся DOCS_ASSETS_DIR=static/swagger-ui. Отдаётся готовая сжатая копия
+по Accept-Encoding, так что на каждый запрос /docs ничего не сжимается заново.
+"""
+import gzip
+import sys
+import urllib.request
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+
+from src.config import settings
+from src.utils.compression import brotli, choose_encoding
+
+SWAGGER_UI_VERSION = "5.17.14"
+SWAGGER_UI_URL = "https://unpkg.com/swagger-ui-dist@{version}/{name}"
+ASSETS = {
+    "swagger-ui-bundle.js": "text/javascript; charset=utf-8",
+    "swagger-ui.css": "text/css; charset=utf-8",
+}
+ASSETS_PREFIX = "/docs/assets"
+# Сжатые копии рядом с файлом: swagger-ui.css.gz, swagger-ui.css.br
+SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+router = APIRouter(prefix=ASSETS_PREFIX, include_in_schema=False)
+
+
+def asset_url(name: str) -> str:
+    if settings.DOCS_ASSETS_DIR:
+        return f"{ASSETS_PREFIX}/{name}"
+    return SWAGGER_UI_URL.format(version=SWAGGER_UI_VERSION, name=name)
+
+
+@router.get("/{name}")
+async def get_asset(name: str, request: Request):
+    if not settings.DOCS_ASSETS_DIR or name not in ASSETS:
+        raise HTTPException(status_code=404, detail="Файл не найден")
+    path = Path(settings.DOCS_ASSETS_DIR) / name
+    headers = {
+        "Vary": "Accept-Encoding",
+        "Cache-Control": f"public, max-age={settings.DOCS_ASSETS_MAX_AGE}",
+    }
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    compressed = path.with_name(name + SUFFIXES[encoding]) if encoding else None
+    if compressed is not None and compressed.exists():
+        path = compressed
+        headers["Content-Encoding"] = encoding
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Файл не найден")
+    return FileResponse(path, media_type=ASSETS[name], headers=headers)
+
+
+def download_assets(directory: Path) -> None:
+    """Скачивает файлы Swagger UI и кладёт рядом сжатые копии."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in ASSETS:
+        url = SWAGGER_UI_URL.format(version=SWAGGER_UI_VERSION, name=name)
+        with urllib.request.urlopen(url) as response:
+            data = response.read()
+        (directory / name).write_bytes(data)
+        (directory / (name + SUFFIXES["gzip"])).write_bytes(gzip.compress(data, compresslevel=9))
+        if brotli is not None:
+            (directory / (name + SUFFIXES["br"])).write_bytes(brotli.compress(data, quality=11))
+        print(f"{name}: {len(data)} байт")
+
+
+if __name__ == "__main__":
+    download_assets(Path(sys.argv[1] if len(sys.argv) > 1 else "static/swagger-ui"))
@@ -0,0 +1,109 @@
+import secrets
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+from src.config import settings
+
+# Ключ версии всей коллекции (например, списка удобств): меняется при любой записи в таблицу
+ALL = "*"
+
+
+class EntityVersions:
+    """
+    Версии записей для ETag, в памяти процесса.
+
+    Версия — номер из общего счётчика, выданный при первом чтении записи; запись
+    через репозиторий после коммита забывает версию, и следующее чтение получает новую.
+    В ETag входит случайная метка процесса, поэтому номера разных процессов не путаются.
+
+    Реестр рассчитан на один процесс: другие воркеры о записи не узнают. Поэтому версии
+    живут не дольше ETAG_VERSION_TTL (по умолчанию 30 с) — за это время ответ из соседнего
+    воркера может отстать от БД. Точная инвалидация между процессами потребовала бы
+    общего хранилища версий (счётчик в БД или Redis).
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.epoch = secrets.token_hex(4)
+        self._counter = 0
+        self._versions: OrderedDict = OrderedDict()  # (namespace, key) -> (version, expires_at)
+
+    def get(self, namespace: str, key) -> int | None:
+        item = self._versions.get((namespace, key))
+        if item is None:
+            return None
+        version, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._versions[(namespace, key)]
+            return None
+        return version
+
+    def remember(self, namespace: str, key) -> int:
+        """Текущая версия записи; если её нет — выдаёт новую."""
+        version = self.get(namespace, key)
+        if version is None:
+            self._counter += 1
+            version = self._counter
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._versions[(namespace, key)] = (version, expires_at)
+            if len(self._versions) > self.maxsize:
+                self._versions.popitem(last=False)
+        return version
+
+    def forget(self, namespace: str, keys=None) -> None:
+        """Сбрасывает версии записей keys (None — всех записей таблицы) и коллекции целиком."""
+        if keys is None:
+            for item in [item for item in self._versions if item[0] == namespace]:
+                del self._versions[item]
+            return
+        for key in (*keys, ALL):
+            self._versions.pop((namespace, key), None)
+
+    def etag(self, versions: list[int]) -> str:
+        # Слабый: версия описывает данные, а не байты ответа, поэтому у сжатого и несжатого
+        # представления (src/utils/compression.py) и у 304 на них один и тот же ETag
+        return 'W/"' + "-".join([self.epoch, *map(str, versions)]) + '"'
+
+
+entity_versions = EntityVersions(maxsize=settings.ETAG_VERSIONS_SIZE, ttl=settings.ETAG_VERSION_TTL)
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    etag = etag.removeprefix("W/")
+    return header.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def _cache_headers(etag: str) -> dict[str, str]:
+    # Vary — как у ответа, прошедшего через сжатие, чтобы 304 подтверждал то же представление
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.HTTP_CACHE_MAX_AGE}",
+        "Vary": "Accept-Encoding",
+    }
+
+
+async def conditional_get(request: Request, response: Response, entities: list[tuple[str, object]], load):
+    """
+    GET с поддержкой If-None-Match для данных, зависящих от записей entities ([(таблица, id), ...]).
+
+    Если версии всех записей известны и клиент прислал тот же ETag — сразу 304, load()
+    не вызывается и к БД не обращаемся. Иначе выполняет load() и ставит ETag, если
+    за время чтения версии не сбросила параллельная запись.
+    """
+    versions = [entity_versions.get(namespace, key) for namespace, key in entities]
+    if None not in versions:
+        etag = entity_versions.etag(versions)
+        if _matches(request, etag):
+            return Response(status_code=304, headers=_cache_headers(etag))
+
+    versions = [entity_versions.remember(namespace, key) for namespace, key in entities]
+    result = await load()
+    if [entity_versions.get(namespace, key) for namespace, key in entities] == versions:
+        response.headers.update(_cache_headers(entity_versions.etag(versions)))
+    return result
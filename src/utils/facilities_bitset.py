@@ -0,0 +1,63 @@
+import numpy as np
+from sqlalchemy import select
+
+from src.config import settings
+from src.models.rooms import RoomsORM
+from src.utils.memory_index import RoomsMemoryIndex
+
+# Удобству с id N соответствует бит N - 1; в знаковый BIGINT помещаются id от 1 до 63
+MAX_MASK_FACILITY_ID = 63
+
+
+def fits_mask(facilities_ids) -> bool:
+    return all(1 <= facility_id <= MAX_MASK_FACILITY_ID for facility_id in facilities_ids)
+
+
+def facilities_mask(facilities_ids) -> int:
+    """Битовая маска набора удобств; удобства, которым не хватило бита, в неё не попадают."""
+    mask = 0
+    for facility_id in set(facilities_ids):
+        if 1 <= facility_id <= MAX_MASK_FACILITY_ID:
+            mask |= 1 << (facility_id - 1)
+    return mask
+
+
+class FacilitiesIndex(RoomsMemoryIndex):
+    """
+    Маски удобств всех комнат в памяти процесса.
+
+    "Комнаты со всеми этими удобствами" — одна векторизованная проверка
+    masks & required == required по массиву, без обращения к rooms_facilities.
+    Перестраивается не реже раза в FACILITIES_INDEX_TTL секунд, см. RoomsMemoryIndex.
+    """
+
+    def reset(self) -> None:
+        super().reset()
+        self.hotel_ids = np.empty(0, dtype=np.int64)
+        self.masks = np.empty(0, dtype=np.int64)
+
+    async def fetch(self, session) -> None:
+        query = select(RoomsORM.id, RoomsORM.hotel_id, RoomsORM.facilities_mask).order_by(RoomsORM.id)
+        self.build((await session.execute(query)).all())
+
+    def build(self, rooms) -> None:
+        """Строит индекс из строк (room_id, hotel_id, facilities_mask), отсортированных по room_id."""
+        self.room_ids = np.fromiter((r[0] for r in rooms), dtype=np.int64, count=len(rooms))
+        self.hotel_ids = np.fromiter((r[1] for r in rooms), dtype=np.int64, count=len(rooms))
+        self.masks = np.fromiter((r[2] for r in rooms), dtype=np.int64, count=len(rooms))
+        self._mark_loaded()
+
+    def set_mask(self, room_id: int, mask: int) -> None:
+        """Инкрементально обновляет маску одной комнаты."""
+        row = self._room_row(room_id)
+        if row is not None:
+            self.masks[row] = mask
+
+    def rooms_ids(self, required_mask: int, hotel_id: int | None = None) -> list[int]:
+        mask = (self.masks & required_mask) == required_mask
+        if hotel_id is not None:
+            mask &= self.hotel_ids == hotel_id
+        return self.room_ids[mask].tolist()
+
+
+facilities_index = FacilitiesIndex(ttl=settings.FACILITIES_INDEX_TTL)
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import numpy as np
+
+
+class RoomsMemoryIndex:
+    """
+    Основа индексов по комнатам в памяти процесса (src/utils/availability.py,
+    src/utils/facilities_bitset.py): ленивая загрузка, инвалидация и перестройка по возрасту.
+
+    Подкласс читает снимок из БД в fetch, раскладывает его в build (отсортированный
+    массив room_ids и свои данные) и отмечает сборку вызовом _mark_loaded.
+    Копия своя в каждом процессе: записи из других воркеров сюда не доходят,
+    поэтому индекс перестраивается не реже раза в ttl секунд.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl
+        self._lock = asyncio.Lock()
+        self._generation = 0  # Растёт при каждой инвалидации, см. load
+        self.reset()
+
+    def reset(self) -> None:
+        self.loaded = False
+        self.loaded_at = 0.0  # time.monotonic() последней сборки
+        self.room_ids = np.empty(0, dtype=np.int64)
+
+    def invalidate(self) -> None:
+        """Помечает индекс устаревшим: он будет перестроен при следующем запросе."""
+        self.loaded = False
+        self._generation += 1
+
+    def is_fresh(self) -> bool:
+        return self.loaded and (self.ttl is None or time.monotonic() - self.loaded_at < self.ttl)
+
+    async def ensure_loaded(self, session) -> None:
+        if self.is_fresh():
+            return
+        async with self._lock:
+            if not self.is_fresh():
+                await self.load(session)
+
+    async def load(self, session) -> None:
+        generation = self._generation
+        await self.fetch(session)
+        if self._generation != generation:
+            # Пока читался снимок, индекс инвалидировали или пришло изменение,
+            # которое снимок мог не увидеть: отвечаем по снимку, но следующий запрос перестроит индекс
+            self.loaded = False
+
+    async def fetch(self, session) -> None:
+        """Читает снимок из БД и вызывает build."""
+        raise NotImplementedError
+
+    def _mark_loaded(self) -> None:
+        self.loaded = True
+        self.loaded_at = time.monotonic()
+
+    def _room_row(self, room_id: int) -> int | None:
+        """
+        Строка комнаты для инкрементального обновления или None, если обновлять нечего.
+        Незагруженный индекс (возможно, как раз строится) и неизвестная комната
+        помечают индекс устаревшим.
+        """
+        if not self.loaded:
+            self.invalidate()
+            return None
+        row = int(np.searchsorted(self.room_ids, room_id))
+        if row >= len(self.room_ids) or self.room_ids[row] != room_id:
+            # Комнату добавили в обход индекса — проще перестроить его целиком
+            self.invalidate()
+            return None
+        return row
@@ -0,0 +1,230 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+
+from sqlalchemy.engine.interfaces import CacheStats
+
+# Границы корзин гистограмм задержек, секунды
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Гистограмма в формате Prometheus.
+
+    Блокировок нет: все замеры пишутся из потока event loop (middleware, события
+    курсора asyncpg, корутины репозиториев), поэтому гонок между ними не бывает.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Последняя корзина — +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class RequestStats:
+    """Запросы к БД, сделанные за время одного HTTP-запроса."""
+
+    __slots__ = ("statements", "db_seconds", "rows")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+class Metrics:
+    def __init__(self):
+        self.request_latency: dict[tuple, Histogram] = {}  # (method, route) -> гистограмма
+        self.requests: dict[tuple, int] = {}  # (method, route, status) -> количество
+        self.request_db: dict[tuple, list] = {}  # (method, route) -> [statements, db_seconds, rows]
+        self.repository_latency: dict[str, Histogram] = {}  # "HotelsRepository.get_all" -> гистограмма
+        self.db_statements = 0
+        self.db_seconds = 0.0
+        # (форма запроса, кэш, результат) -> количество; кэш — compiled (SQLAlchemy) или prepared (asyncpg)
+        self.statement_cache: dict[tuple, int] = {}
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        histogram = self.request_latency.get(key)
+        if histogram is None:
+            histogram = self.request_latency[key] = Histogram()
+        histogram.observe(seconds)
+        status_key = (method, route, status)
+        self.requests[status_key] = self.requests.get(status_key, 0) + 1
+        db = self.request_db.setdefault(key, [0, 0.0, 0])
+        db[0] += stats.statements
+        db[1] += stats.db_seconds
+        db[2] += stats.rows
+
+    def observe_repository_call(self, call: str, seconds: float) -> None:
+        histogram = self.repository_latency.get(call)
+        if histogram is None:
+            histogram = self.repository_latency[call] = Histogram()
+        histogram.observe(seconds)
+
+    def observe_statement_cache(self, shape: str, cache: str, result: str) -> None:
+        key = (shape, cache, result)
+        self.statement_cache[key] = self.statement_cache.get(key, 0) + 1
+
+    def statement_cache_hit_rates(self) -> dict:
+        """Доля попаданий в каждый кэш по формам запросов."""
+        stats: dict[str, dict] = {}
+        for (shape, cache, result), count in self.statement_cache.items():
+            counts = stats.setdefault(shape, {}).setdefault(cache, {"hit": 0, "total": 0})
+            counts["total"] += count
+            if result == "hit":
+                counts["hit"] += count
+        for caches in stats.values():
+            for counts in caches.values():
+                counts["hit_rate"] = counts["hit"] / counts["total"]
+        return stats
+
+    def render(self) -> str:
+        """Текстовый формат экспозиции Prometheus 0.0.4."""
+        lines = []
+
+        def histogram_lines(name: str, labels: str, histogram: Histogram) -> None:
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += histogram.counts[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        lines += ["# HELP http_request_duration_seconds Время обработки запроса по маршрутам",
+                  "# TYPE http_request_duration_seconds histogram"]
+        for (method, route), histogram in self.request_latency.items():
+            histogram_lines("http_request_duration_seconds", _labels(method=method, route=route), histogram)
+
+        lines += ["# HELP http_requests_total Запросы по маршрутам и кодам ответа",
+                  "# TYPE http_requests_total counter"]
+        for (method, route, status), count in self.requests.items():
+            lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+
+        for index, (name, help_text) in enumerate((
+                ("http_request_db_statements_total", "SQL-запросы, выполненные при обработке запросов"),
+                ("http_request_db_seconds_total", "Время в БД при обработке запросов"),
+                ("http_request_db_rows_total", "Строки, полученные или изменённые SQL-запросами"),
+        )):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (method, route), db in self.request_db.items():
+                lines.append(f"{name}{{{_labels(method=method, route=route)}}} {db[index]}")
+
+        lines += ["# HELP repository_call_duration_seconds Время вызовов методов репозиториев",
+                  "# TYPE repository_call_duration_seconds histogram"]
+        for call, histogram in self.repository_latency.items():
+            histogram_lines("repository_call_duration_seconds", _labels(call=call), histogram)
+
+        lines += ["# HELP db_statements_total Все SQL-запросы процесса",
+                  "# TYPE db_statements_total counter",
+                  f"db_statements_total {self.db_statements}",
+                  "# HELP db_seconds_total Суммарное время SQL-запросов процесса",
+                  "# TYPE db_seconds_total counter",
+                  f"db_seconds_total {self.db_seconds}"]
+
+        lines += ["# HELP db_statement_cache_total Обращения к кэшам SQL по формам запросов",
+                  "# TYPE db_statement_cache_total counter"]
+        for (shape, cache, result), count in self.statement_cache.items():
+            lines.append(f"db_statement_cache_total{{{_labels(shape=shape, cache=cache, result=result)}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+metrics = Metrics()
+
+_COMPILED_CACHE_RESULTS = {CacheStats.CACHE_HIT: "hit", CacheStats.CACHE_MISS: "miss"}
+
+# Статистика текущего HTTP-запроса; None вне запроса (миграции, фоновые задачи)
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+# Метод репозитория, который сейчас выполняется ("HotelsRepository.get_all")
+current_call: ContextVar[str | None] = ContextVar("current_call", default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Форма — имя шаблона (src/utils/statement_cache.py) или метод репозитория, выполняющий запрос
+    shape = context.execution_options.get("query_shape") or current_call.get() or "other"
+    if context.compiled is not None:
+        metrics.observe_statement_cache(shape, "compiled", _COMPILED_CACHE_RESULTS.get(context.cache_hit, "off"))
+    # Кэш подготовленных statement адаптера asyncpg в SQLAlchemy, ключ — текст SQL
+    prepared = getattr(getattr(cursor, "_adapt_connection", None), "_prepared_statement_cache", None)
+    if prepared is not None:
+        metrics.observe_statement_cache(shape, "prepared", "hit" if statement in prepared else "miss")
+    context._metrics_start = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_start
+    metrics.db_statements += 1
+    metrics.db_seconds += elapsed
+    stats = request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        # Для серверного курсора (session.stream) число строк заранее неизвестно: -1
+        stats.rows += max(cursor.rowcount, 0)
+
+
+def timed_call(call: str, func):
+    """Оборачивает корутину так, чтобы её время попадало в repository_call_duration_seconds."""
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = current_call.set(call)
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            metrics.observe_repository_call(call, time.perf_counter() - start)
+            current_call.reset(token)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware: время ответа и статистика БД по шаблону маршрута
+    (/hotels/{hotel_id}, а не /hotels/1 — чтобы число серий не росло с данными).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_stats.reset(token)
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"], getattr(route, "path", "unmatched"), status, elapsed, stats,
+            )
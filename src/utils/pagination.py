@@ -0,0 +1,33 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+
+
+def encode_cursor(last_id: int, sort: str = "id") -> str:
+    """
+    Непрозрачный курсор для keyset-пагинации: id последней записи страницы и ключ сортировки.
+    Значение ключа сортировки (например, ранг поиска) пересчитывается в запросе по id.
+    """
+    payload = json.dumps({"id": last_id, "sort": sort}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str = "id") -> int:
+    """Возвращает id последней записи; курсор от другой сортировки считается некорректным."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        last_id, cursor_sort = int(payload["id"]), payload["sort"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail="Курсор не подходит к этой сортировке")
+    return last_id
+
+
+def next_cursor(items: list, limit: int | None, sort: str = "id") -> str | None:
+    """Курсор следующей страницы или None, если страница неполная (дальше записей нет)."""
+    if not limit or len(items) < limit:
+        return None
+    return encode_cursor(items[-1].id, sort)
@@ -0,0 +1,93 @@
+import inspect
+from functools import wraps
+
+import pydantic_core
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+# Служебный параметр, через который обёртка получает Response, куда эндпоинты пишут заголовки
+SUB_RESPONSE_PARAM = "_fast_json_sub_response"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse, который кодирует через pydantic_core вместо json.dumps."""
+
+    def render(self, content) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Маршрут с быстрой сериализацией ответа по response_model.
+
+    Обычно FastAPI валидирует результат эндпоинта, превращает его в dict/list
+    и уже их кодирует json.dumps. Здесь результат валидируется и сразу пишется в байты
+    одним вызовом TypeAdapter(response_model).dump_json, без промежуточных dict.
+    Код ответа и заголовки, выставленные эндпоинтом через параметр Response, сохраняются.
+    Эндпоинты без response_model и те, что сами возвращают Response, работают как раньше.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router пересоздаёт маршрут с уже обёрнутым эндпоинтом — берём исходный
+        endpoint = getattr(endpoint, "_fast_json_endpoint", endpoint)
+        super().__init__(path, self._wrap_endpoint(endpoint), **kwargs)
+        self._adapter = TypeAdapter(self.response_model) if self.response_field is not None else None
+
+    def _wrap_endpoint(self, endpoint):
+        is_coroutine = inspect.iscoroutinefunction(endpoint)
+        signature = inspect.signature(endpoint)
+        # FastAPI подставляет Response только в один параметр: если эндпоинт уже его принимает,
+        # пользуемся им, иначе добавляем свой служебный
+        response_param = next(
+            (name for name, param in signature.parameters.items() if param.annotation is Response),
+            None,
+        )
+
+        @wraps(endpoint)
+        async def wrapper(**kwargs):
+            if response_param is None:
+                sub_response = kwargs.pop(SUB_RESPONSE_PARAM)
+            else:
+                sub_response = kwargs[response_param]
+            if is_coroutine:
+                result = await endpoint(**kwargs)
+            else:
+                result = await run_in_threadpool(endpoint, **kwargs)
+            if self._adapter is None or isinstance(result, Response):
+                return result
+            return self._render(result, sub_response)
+
+        if response_param is None:
+            wrapper.__signature__ = signature.replace(parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter(SUB_RESPONSE_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+            ])
+        else:
+            wrapper.__signature__ = signature
+        wrapper._fast_json_endpoint = endpoint
+        return wrapper
+
+    def _render(self, result, sub_response: Response) -> Response:
+        try:
+            value = self._adapter.validate_python(result, from_attributes=True)
+        except ValidationError as e:
+            raise ResponseValidationError(errors=e.errors(include_url=False), body=result)
+        content = self._adapter.dump_json(
+            value,
+            include=self.response_model_include,
+            exclude=self.response_model_exclude,
+            by_alias=self.response_model_by_alias,
+            exclude_unset=self.response_model_exclude_unset,
+            exclude_defaults=self.response_model_exclude_defaults,
+            exclude_none=self.response_model_exclude_none,
+        )
+        response = Response(
+            content,
+            status_code=sub_response.status_code or self.status_code or 200,
+            media_type="application/json",
+        )
+        response.headers.raw.extend(sub_response.headers.raw)
+        return response
@@ -0,0 +1,31 @@
+"""
+Шаблоны горячих запросов.
+
+Запрос строится один раз на форму — набор включённых фильтров, сортировку, бэкенд, — а значения
+приходят параметрами (bindparam) при выполнении. Готовое дерево не собирается заново на каждый
+HTTP-запрос, ключ кэша SQLAlchemy у него запоминается, а одинаковый текст SQL позволяет asyncpg
+переиспользовать подготовленный statement. Попадания в оба кэша по формам считает
+src/utils/metrics.py (db_statement_cache_total в /metrics, сводка в /internal/statement-cache).
+"""
+
+
+class StatementTemplates:
+    def __init__(self):
+        self._templates: dict[tuple, object] = {}
+
+    def get(self, shape: tuple, build):
+        """
+        Шаблон запроса формы shape; при первом обращении строится вызовом build().
+        Форма должна состоять из конечного набора значений (флаги, названия), а не из данных запроса.
+        """
+        template = self._templates.get(shape)
+        if template is None:
+            name = ":".join(str(part) for part in shape)
+            template = self._templates[shape] = build().execution_options(query_shape=name)
+        return template
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+
+statement_templates = StatementTemplates()